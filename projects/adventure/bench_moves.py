@@ -0,0 +1,46 @@
+"""
+Micro-benchmark for the movement hot path
+
+Builds a long random walk over maps/main_maze.txt, then times replaying it
+with Player.travel and looking up exits with Room.get_exits, reporting the
+cost per move.
+"""
+import random
+import time
+from player import Player
+from world import World
+
+def random_walk(world, moves, seed=0):
+    rng = random.Random(seed)
+    room = world.starting_room
+    walk = []
+    for _ in range(moves):
+        direction = rng.choice(room.exits)
+        walk.append(direction)
+        room = room.get_room_in_direction(direction)
+    return walk
+
+def time_travel(world, walk):
+    player = Player(world.starting_room)
+    start = time.perf_counter()
+    for direction in walk:
+        player.travel(direction)
+    return time.perf_counter() - start
+
+def time_get_exits(world, walk):
+    player = Player(world.starting_room)
+    start = time.perf_counter()
+    for direction in walk:
+        player.current_room.get_exits()
+        player.travel(direction)
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    world = World()
+    world.load_file("maps/main_maze.txt")
+    walk = random_walk(world, 1000000)
+    travel_time = time_travel(world, walk)
+    exits_time = time_get_exits(world, walk)
+    print(f"{len(walk)} moves on main_maze.txt")
+    print(f"travel:             {travel_time / len(walk) * 1e9:.1f} ns/move")
+    print(f"travel + get_exits: {exits_time / len(walk) * 1e9:.1f} ns/move")
@@ -0,0 +1,72 @@
+"""
+Streaming map loaders
+
+Maps can be read from the original dictionary-literal .txt files or from
+the line-oriented .rooms format, which has one room per line:
+
+    room_id x y n s e w
+
+where each exit is the id of the connected room, or -1 for no exit.
+Both readers yield (room_id, (x, y), exits) one room at a time, the same
+shape as the items of the dictionaries in maps/*.txt.
+"""
+import re
+import sys
+
+DIRECTIONS = ['n', 's', 'e', 'w']
+
+ROOM_LINE = re.compile(r"\s*(\d+)\s*:\s*\[\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)\s*,\s*\{([^}]*)\}\s*\]\s*,?\s*$")
+EXIT = re.compile(r"'([nsew])'\s*:\s*(\d+)")
+
+def iter_rooms_literal(path):
+    """
+    Read a map in the maps/*.txt format line by line, without
+    evaluating it as Python.
+    """
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            stripped = line.strip()
+            if stripped in ('', '{', '}'):
+                continue
+            match = ROOM_LINE.match(line)
+            if match is None:
+                raise Exception(f"{path}:{line_number}: could not read room '{stripped}'")
+            room_id, x, y, exits = match.groups()
+            yield int(room_id), (int(x), int(y)), {d: int(r) for d, r in EXIT.findall(exits)}
+
+def iter_rooms_lines(path):
+    """
+    Read a map in the .rooms format.
+    """
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            fields = line.split()
+            if len(fields) == 0:
+                continue
+            if len(fields) != 7:
+                raise Exception(f"{path}:{line_number}: expected 7 fields, got {len(fields)}")
+            room_id, x, y, *exit_ids = map(int, fields)
+            yield room_id, (x, y), {d: r for d, r in zip(DIRECTIONS, exit_ids) if r >= 0}
+
+def iter_rooms(path):
+    """
+    Read a map in either format, chosen by file extension.
+    """
+    if path.endswith('.rooms'):
+        return iter_rooms_lines(path)
+    return iter_rooms_literal(path)
+
+def convert_map(source, destination):
+    """
+    Write the map at source to destination in the .rooms format.
+    """
+    with open(destination, 'w') as f:
+        for room_id, (x, y), exits in iter_rooms(source):
+            exit_ids = ' '.join(str(exits.get(d, -1)) for d in DIRECTIONS)
+            f.write(f"{room_id} {x} {y} {exit_ids}\n")
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        print("usage: python map_loader.py maps/main_maze.txt maps/main_maze.rooms")
+    else:
+        convert_map(sys.argv[1], sys.argv[2])
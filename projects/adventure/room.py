@@ -1,59 +1,98 @@
 # Implement a class to hold room information. This should have name and
 # description attributes.
+from operator import attrgetter
+
+DIRECTIONS = ["n", "s", "e", "w"]
+DIRECTION_INDEX = {"n": 0, "s": 1, "e": 2, "w": 3}
+OPPOSITE_INDEX = (1, 0, 3, 2)
+OPPOSITE = {"n": "s", "s": "n", "e": "w", "w": "e"}
+# order get_exits lists directions in, as direction indexes
+EXIT_ORDER = (0, 1, 3, 2)
+# exits for every bitmask of direction indexes, shared by all rooms
+EXITS_BY_MASK = tuple(tuple(DIRECTIONS[i] for i in EXIT_ORDER if (mask >> i) & 1) for mask in range(16))
+# slot holding the neighboring room in each direction
+LINK_SLOTS = ("_n", "_s", "_e", "_w")
+LINK_GETTERS = {direction: attrgetter(slot) for direction, slot in zip(DIRECTIONS, LINK_SLOTS)}
+
 class Room:
-    def __init__(self, name, description, id=0, x=None, y=None):
+    # neighboring rooms are held in one slot per direction, and the
+    # directions with exits in a bitmask (bit i for direction index i)
+    __slots__ = ("id", "x", "y", "_name", "_description", "_n", "_s", "_e", "_w", "_exit_mask")
+    def __init__(self, name=None, description=None, id=0, x=None, y=None):
         self.id = id
-        self.name = name
-        self.description = description
-        self.n_to = None
-        self.s_to = None
-        self.e_to = None
-        self.w_to = None
+        self._name = name
+        self._description = description
+        self._n = None
+        self._s = None
+        self._e = None
+        self._w = None
+        self._exit_mask = 0
         self.x = x
         self.y = y
+    @property
+    def name(self):
+        return self._name if self._name is not None else f"Room {self.id}"
+    @name.setter
+    def name(self, name):
+        self._name = name
+    @property
+    def description(self):
+        return self._description if self._description is not None else f"({self.x},{self.y})"
+    @description.setter
+    def description(self, description):
+        self._description = description
+    @property
+    def n_to(self):
+        return self._n
+    @n_to.setter
+    def n_to(self, room):
+        self._set_link(0, room)
+    @property
+    def s_to(self):
+        return self._s
+    @s_to.setter
+    def s_to(self, room):
+        self._set_link(1, room)
+    @property
+    def e_to(self):
+        return self._e
+    @e_to.setter
+    def e_to(self, room):
+        self._set_link(2, room)
+    @property
+    def w_to(self):
+        return self._w
+    @w_to.setter
+    def w_to(self, room):
+        self._set_link(3, room)
+    def _set_link(self, index, room):
+        setattr(self, LINK_SLOTS[index], room)
+        if room is None:
+            self._exit_mask &= ~(1 << index)
+        else:
+            self._exit_mask |= 1 << index
     def __str__(self):
         return f"\n-------------------\n\n{self.name}\n\n   {self.description}\n\n{self.get_exits_string()}\n"
     def print_room_description(self, player):
         print(str(self))
+    @property
+    def exits(self):
+        return EXITS_BY_MASK[self._exit_mask]
     def get_exits(self):
-        exits = []
-        if self.n_to is not None:
-            exits.append("n")
-        if self.s_to is not None:
-            exits.append("s")
-        if self.w_to is not None:
-            exits.append("w")
-        if self.e_to is not None:
-            exits.append("e")
-        return exits
+        return list(EXITS_BY_MASK[self._exit_mask])
     def get_exits_string(self):
         return f"Exits: [{', '.join(self.get_exits())}]"
     def connect_rooms(self, direction, connecting_room):
-        if direction == "n":
-            self.n_to = connecting_room
-            connecting_room.s_to = self
-        elif direction == "s":
-            self.s_to = connecting_room
-            connecting_room.n_to = self
-        elif direction == "e":
-            self.e_to = connecting_room
-            connecting_room.w_to = self
-        elif direction == "w":
-            self.w_to = connecting_room
-            connecting_room.e_to = self
-        else:
+        if direction not in DIRECTION_INDEX:
             print("INVALID ROOM CONNECTION")
             return None
+        index = DIRECTION_INDEX[direction]
+        self._set_link(index, connecting_room)
+        connecting_room._set_link(OPPOSITE_INDEX[index], self)
     def get_room_in_direction(self, direction):
-        if direction == "n":
-            return self.n_to
-        elif direction == "s":
-            return self.s_to
-        elif direction == "e":
-            return self.e_to
-        elif direction == "w":
-            return self.w_to
-        else:
+        try:
+            return LINK_GETTERS[direction](self)
+        except KeyError:
             return None
     def get_coords(self):
         return [self.x, self.y]
@@ -0,0 +1,29 @@
+import unittest
+import os
+import tempfile
+from ast import literal_eval
+from map_loader import iter_rooms, iter_rooms_lines, convert_map
+
+MAPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps")
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.map_files = sorted(os.path.join(MAPS, name) for name in os.listdir(MAPS) if name.endswith(".txt"))
+
+    def test_iter_rooms(self):
+        for map_file in self.map_files:
+            with open(map_file, 'r') as f:
+                room_graph = literal_eval(f.read())
+            rooms = {room_id: [xy, exits] for room_id, xy, exits in iter_rooms(map_file)}
+            self.assertDictEqual(rooms, room_graph, map_file)
+
+    def test_convert_map(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for map_file in self.map_files:
+                rooms_file = os.path.join(directory, os.path.basename(map_file)[:-4] + ".rooms")
+                convert_map(map_file, rooms_file)
+                self.assertListEqual(list(iter_rooms_lines(rooms_file)), list(iter_rooms(map_file)))
+                self.assertListEqual(list(iter_rooms(rooms_file)), list(iter_rooms(map_file)))
+
+if __name__ == '__main__':
+    unittest.main()
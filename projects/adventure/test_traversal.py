@@ -0,0 +1,124 @@
+import unittest
+import os
+import random
+from ast import literal_eval
+from room import Room, OPPOSITE
+from player import Player
+from world import World
+from traversal import TraversalPlanner, find_best_traversal
+
+MAPS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps")
+MAIN_MAZE = os.path.join(MAPS, "main_maze.txt")
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.map_files = sorted(os.path.join(MAPS, name) for name in os.listdir(MAPS) if name.endswith(".txt"))
+
+    def walk(self, world, path):
+        player = Player(world.starting_room)
+        visited = {player.current_room.id}
+        for move in path:
+            player.travel(move)
+            visited.add(player.current_room.id)
+        return visited
+
+    def test_connect_rooms(self):
+        # rooms made without ids all share the default id of 0
+        a = Room("A", "a")
+        b = Room("B", "b")
+        c = Room("C", "c")
+        a.connect_rooms("n", b)
+        b.connect_rooms("e", c)
+        self.assertIs(a.n_to, b)
+        self.assertIs(b.s_to, a)
+        self.assertIs(c.get_room_in_direction("w"), b)
+        self.assertIsNone(a.get_room_in_direction("x"))
+        self.assertListEqual(b.get_exits(), ["s", "e"])
+        b.e_to = None
+        self.assertListEqual(b.get_exits(), ["s"])
+        a.name = "Hall"
+        self.assertEqual(a.name, "Hall")
+
+    def test_load_rooms(self):
+        for map_file in self.map_files:
+            with open(map_file, 'r') as f:
+                room_graph = literal_eval(f.read())
+            world = World()
+            world.load_file(map_file)
+            self.assertEqual(len(world.rooms), len(room_graph))
+            # connections go both ways, even where a map only lists one side
+            links = {room_id: {} for room_id in room_graph}
+            for room_id, (_, exits) in room_graph.items():
+                for direction, other_id in exits.items():
+                    links[room_id][direction] = other_id
+                    links[other_id][OPPOSITE[direction]] = room_id
+            for room_id, ((x, y), _) in room_graph.items():
+                room = world.rooms[room_id]
+                self.assertIs(world.room_grid[x][y], room)
+                self.assertSetEqual(set(room.get_exits()), set(links[room_id]))
+                for direction, other_id in links[room_id].items():
+                    self.assertIs(room.get_room_in_direction(direction), world.rooms[other_id])
+
+    def test_load_rooms_forward_references(self):
+        # room 0 refers to rooms that are only loaded after it
+        world = World()
+        world.load_rooms([(0, (1, 1), {'n': 1, 'e': 2}), (1, (1, 2), {'s': 0}), (2, (2, 1), {'w': 0})])
+        self.assertIs(world.rooms[0].n_to, world.rooms[1])
+        self.assertIs(world.rooms[2].w_to, world.rooms[0])
+        self.assertRaises(Exception, world.load_rooms, [(0, (0, 0), {'n': 5})])
+
+    def test_plan_covers_every_room(self):
+        for map_file in self.map_files:
+            world = World()
+            world.load_file(map_file)
+            path, stats = TraversalPlanner(world, random.Random(0)).plan()
+            self.assertSetEqual(self.walk(world, path), set(world.rooms), map_file)
+            self.assertEqual(stats["moves"], len(path))
+            self.assertFalse(stats["aborted"])
+
+    def test_plan_cutoff(self):
+        world = World()
+        world.load_file(MAIN_MAZE)
+        path, stats = TraversalPlanner(world, random.Random(0)).plan(cutoff=10)
+        self.assertIsNone(path)
+        self.assertTrue(stats["aborted"])
+
+    def test_find_best_traversal(self):
+        world = World()
+        world.load_file(MAIN_MAZE)
+        result = find_best_traversal(MAIN_MAZE, attempts=6, seed=3)
+        self.assertEqual(result["run"], 6)
+        self.assertEqual(len(result["lengths"]) + result["aborted"], 6)
+        self.assertEqual(result["length"], min(result["lengths"]))
+        self.assertSetEqual(self.walk(world, result["path"]), set(world.rooms))
+        for lower_bound in result["lower_bounds"]:
+            self.assertGreater(lower_bound, result["length"])
+        # the chosen attempt can be replayed from its seed
+        planner = TraversalPlanner(world, random.Random(result["seed"]))
+        self.assertListEqual(planner.plan()[0], result["path"])
+
+    def test_find_best_traversal_is_reproducible(self):
+        for map_file in self.map_files:
+            first = find_best_traversal(map_file, attempts=4, seed=11)
+            self.assertDictEqual(find_best_traversal(map_file, attempts=4, seed=11), first)
+
+    def test_find_best_traversal_without_cutoff(self):
+        result = find_best_traversal(MAIN_MAZE, attempts=4, seed=3, early_cutoff=False)
+        self.assertEqual(len(result["lengths"]), 4)
+        self.assertEqual(result["aborted"], 0)
+        self.assertListEqual(result["lower_bounds"], [])
+
+    def test_find_best_traversal_time_budget(self):
+        result = find_best_traversal(MAIN_MAZE, attempts=4, seed=3, time_budget=0)
+        self.assertEqual(result["run"], 0)
+        self.assertIsNone(result["path"])
+
+    def test_find_best_traversal_processes(self):
+        serial = find_best_traversal(MAIN_MAZE, attempts=6, seed=3)
+        pooled = find_best_traversal(MAIN_MAZE, attempts=6, seed=3, processes=2)
+        self.assertEqual(pooled["run"], 6)
+        # the shortest walk is never cut off, however attempts are spread
+        self.assertEqual(pooled["length"], serial["length"])
+
+if __name__ == '__main__':
+    unittest.main()
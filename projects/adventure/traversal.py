@@ -0,0 +1,277 @@
+"""
+Maze traversal planner
+
+Finds a walk that visits every room of a World, taking each loop in the
+maze once and then steering away from it. Nothing here prints, so the
+planner can be run repeatedly, timed, or embedded elsewhere.
+"""
+import random
+import time
+from collections import deque
+from multiprocessing import Pool, Value
+from room import OPPOSITE
+from world import World
+
+class TraversalPlanner:
+    def __init__(self, world, rng=random):
+        self.world = world
+        self.rng = rng
+        self.start = world.starting_room
+        # distance of every room from the start, in moves
+        self.distance = self.get_distances(self.start)
+        # loops is a list of loops, each a list of directions to walk it;
+        # corr maps each room in a loop to (loop id, position in loop)
+        self.loops, self.corr = self.get_loops(self.start)
+
+    def get_distances(self, start_room):
+        distance = {start_room.id: 0}
+        q = deque()
+        q.append(start_room)
+
+        while len(q) > 0:
+            room = q.popleft()
+            for e in room.get_exits():
+                rm2 = room.get_room_in_direction(e)
+                if rm2.id not in distance:
+                    distance[rm2.id] = distance[room.id] + 1
+                    q.append(rm2)
+        return distance
+
+    def get_loops(self, start_room):
+        # find any/all loops by doing a full depth-first traversal
+
+        # each loop is a list of directions (forward, backward) to take to traverse the loop
+        loops = []
+        # stores which loop ID each room corresponds to (if any, only one for this problem)
+        # and also what position that room is in inside the corresponding loop structure
+        corr = {}
+
+        unfinished = {}
+        current_path = deque()
+        visited = set()
+
+        unfinished[start_room.id] = start_room.get_exits()
+        current_path.append((start_room, None))
+        visited.add(start_room.id)
+        while len(unfinished) > 0:
+            # last room in path is the one we're on
+            current = current_path[len(current_path) - 1][0]
+            if current.id in unfinished:
+                dirs_left = unfinished[current.id]
+                # take an arbitrary direction out of the unfinished list
+                next_direction = dirs_left.pop()
+                # when all paths from the room are finished, we take the room out of our map
+                if len(dirs_left) == 0:
+                    unfinished.pop(current.id)
+                next_room = current.get_room_in_direction(next_direction)
+                if next_room.id not in visited:
+                    visited.add(next_room.id)
+                    # the path also contains what direction we need to go backward
+                    current_path.append((next_room, OPPOSITE[next_direction]))
+                    subsequent_rooms = next_room.get_exits()
+                    # remove 'backwards' from next room
+                    subsequent_rooms.remove(OPPOSITE[next_direction])
+                    if len(subsequent_rooms) > 0:
+                        unfinished[next_room.id] = subsequent_rooms
+                else:
+                    # we've reached a loop point
+                    loop_id = len(loops)
+                    loop = []
+                    # 'next_room' will be index 0
+                    # 'next_room' would go backward to end up in 'current'
+                    first_dir = OPPOSITE[next_direction]
+                    loop.append(first_dir)
+                    first_dir_left = unfinished[next_room.id]
+                    first_dir_left.remove(first_dir)
+                    if len(first_dir_left) == 0:
+                        unfinished.pop(next_room.id)
+                    corr[next_room.id] = (loop_id, 0)
+                    for i, v in enumerate(reversed(current_path), 1):
+                        back_room = v[0]
+                        back_dir = v[1]
+                        if back_room.id == next_room.id:
+                            break
+                        loop.append(back_dir)
+                        corr[back_room.id] = (loop_id, i)
+
+                    loops.append(loop)
+            else:
+                current_path.pop()
+        return loops, corr
+
+    def plan(self, cutoff=None):
+        """
+        Walk the maze once and return (traversal_path, stats), where
+        traversal_path is the list of directions taken and stats is a
+        dictionary of counts describing the walk.
+
+        If the walk grows longer than cutoff moves it is abandoned and
+        traversal_path is None.
+        """
+        loops, corr = self.loops, self.corr
+        room = self.start
+        traversal_path = []
+        backtracks = 0
+
+        # maps room id to a set of paths not taken yet
+        unfinished = {}
+        visited = set()
+        # like traversal_path, but removes elements when walking back
+        current_path = deque()
+
+        unfinished[room.id] = room.get_exits()
+        visited.add(room.id)
+
+        # used to tell if we've been in a loop in prior turns
+        # we store the room it started on and how large the path was, for easy backtracking
+        # when we get to that room again, we can avoid cut a chunk of our current_path off
+        loops_entered = {}
+
+        while len(unfinished) > 0:
+            # see if there are unfinished exits at any point
+            if room.id in unfinished:
+                # STRATEGY: we want to take any loop we run into, but deviate as much as possible after that
+
+                exits = unfinished[room.id]
+                # check and see if we're in a loop, first off
+                if room.id in corr:
+                    loop_id, loop_position = corr[room.id]
+                    loop_forward = loops[loop_id][loop_position]
+                    loop_backward = OPPOSITE[loops[loop_id][loop_position - 1]]
+                    if loop_id not in loops_entered:
+                        choice = loop_forward
+                        loops_entered[loop_id] = (room.id, len(current_path))
+                    else:
+                        entered_room, shortcut = loops_entered[loop_id]
+                        excluded = [e for e in exits if e not in [loop_forward, loop_backward]]
+                        choice = self.rng.choice(excluded if len(excluded) else exits)
+                        if room.id == entered_room:
+                            current_path = deque(list(current_path)[:shortcut])
+                else:
+                    choice = self.rng.choice(exits)
+
+                exits.remove(choice)
+                # if this is our last exit in the room to take, remove it from the 'unfinished' set
+                if len(exits) == 0:
+                    unfinished.pop(room.id)
+
+                # travel to the room
+                room = room.get_room_in_direction(choice)
+                traversal_path.append(choice)
+                current_path.append(choice)
+                if cutoff is not None and len(traversal_path) > cutoff:
+                    return None, {"moves": len(traversal_path), "aborted": True}
+
+                # we don't have to travel backwards, remove that direction from whatever this room is
+                if room.id not in visited:
+                    next_exits = room.get_exits()
+                    next_exits.remove(OPPOSITE[choice])
+                    if len(next_exits) > 0:
+                        unfinished[room.id] = next_exits
+                elif room.id in unfinished:
+                    next_exits = unfinished[room.id]
+                    next_exits.remove(OPPOSITE[choice])
+                    if len(next_exits) == 0:
+                        unfinished.pop(room.id)
+
+                visited.add(room.id)
+            else:
+                backward = OPPOSITE[current_path.pop()]
+                room = room.get_room_in_direction(backward)
+                traversal_path.append(backward)
+                backtracks += 1
+                if cutoff is not None and len(traversal_path) > cutoff:
+                    return None, {"moves": len(traversal_path), "aborted": True}
+
+        stats = {
+            "moves": len(traversal_path),
+            "aborted": False,
+            "backtracks": backtracks,
+            "rooms": len(self.world.rooms),
+            "rooms_visited": len(visited),
+            "loops": len(loops),
+            "rooms_in_loops": sum(map(lambda l: len(l), loops)),
+        }
+        return traversal_path, stats
+
+# planner and shared best length so far, set up once per worker process
+_planner = None
+_best = None
+_early_cutoff = True
+
+def _init_worker(map_file, best, early_cutoff):
+    global _planner, _best, _early_cutoff
+    world = World()
+    world.load_file(map_file)
+    _planner = TraversalPlanner(world)
+    _best = best
+    _early_cutoff = early_cutoff
+
+def _plan_attempt(planner, seed, cutoff):
+    planner.rng = random.Random(seed)
+    path, stats = planner.plan(cutoff)
+    if path is None or stats["rooms_visited"] != stats["rooms"]:
+        path = None
+    return seed, path, stats
+
+def _run_attempt(seed):
+    cutoff = _best.value if _early_cutoff and _best.value > 0 else None
+    seed, path, stats = _plan_attempt(_planner, seed, cutoff)
+    if path is not None:
+        with _best.get_lock():
+            if _best.value == 0 or len(path) < _best.value:
+                _best.value = len(path)
+    return seed, path, stats
+
+def find_best_traversal(map_file, attempts=100, seed=None, processes=None, time_budget=None, early_cutoff=True):
+    """
+    Plan up to the given number of seeded walks over map_file and keep
+    the shortest one that visits every room.
+
+    Each attempt gets its own seed drawn from seed, so a run can be
+    reproduced. With processes set, attempts run in a process pool.
+    With time_budget (in seconds) no results are collected after it
+    runs out. With early_cutoff, attempts stop as soon as they are
+    longer than the best walk found so far.
+
+    Returns a dictionary with the best "path" and its "seed" and
+    "length", the "lengths" of every completed attempt, and the number
+    of attempts "run" and "aborted". Attempts stopped early are not in
+    "lengths"; "lower_bounds" holds the length each had reached, which
+    its full walk would have been at least. Turn off early_cutoff for
+    the full distribution of lengths.
+    """
+    seeds = random.Random(seed)
+    attempt_seeds = [seeds.getrandbits(64) for _ in range(attempts)]
+    result = {"path": None, "seed": None, "length": None, "lengths": [], "lower_bounds": [], "run": 0, "aborted": 0}
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    def record(attempt_seed, path, stats):
+        result["run"] += 1
+        if path is None:
+            result["aborted"] += 1
+            if stats["aborted"]:
+                result["lower_bounds"].append(stats["moves"])
+            return
+        result["lengths"].append(len(path))
+        if result["length"] is None or len(path) < result["length"]:
+            result["path"], result["seed"], result["length"] = path, attempt_seed, len(path)
+
+    if processes is None:
+        world = World()
+        world.load_file(map_file)
+        planner = TraversalPlanner(world)
+        for attempt_seed in attempt_seeds:
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            record(*_plan_attempt(planner, attempt_seed, result["length"] if early_cutoff else None))
+    else:
+        # length of the best walk so far across all processes, 0 for none yet
+        best = Value('i', 0)
+        with Pool(processes, initializer=_init_worker, initargs=(map_file, best, early_cutoff)) as pool:
+            for attempt_seed, path, stats in pool.imap_unordered(_run_attempt, attempt_seeds):
+                record(attempt_seed, path, stats)
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+
+    return result
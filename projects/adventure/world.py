@@ -1,5 +1,5 @@
-from colorama import init, deinit, Back, Fore
 from room import Room
+from map_loader import iter_rooms
 import random
 import math
 
@@ -7,43 +7,48 @@ class World:
     def __init__(self):
         self.starting_room = None
         self.rooms = {}
-        self.room_grid = []
+        self.room_grid = {}
         self.grid_size = 0
     def load_graph(self, room_graph):
-        num_rooms = len(room_graph)
-        rooms = [None] * num_rooms
+        self.load_rooms((room_id, room_graph[room_id][0], room_graph[room_id][1]) for room_id in room_graph)
+    def load_file(self, map_file):
+        self.load_rooms(iter_rooms(map_file))
+    def load_rooms(self, rooms):
+        # rooms is an iterable of (room_id, (x, y), exits); an exit to a
+        # room that is not loaded yet is connected once that room loads
+        self.rooms = {}
+        # the grid is sparse, room_grid[x][y] is the room at (x, y)
+        self.room_grid = {}
+        # connections waiting for their room to be loaded
+        pending = {}
         grid_size = 1
-        for i in range(0, num_rooms):
-            x = room_graph[i][0][0]
-            grid_size = max(grid_size, room_graph[i][0][0], room_graph[i][0][1])
-            self.rooms[i] = Room(f"Room {i}", f"({room_graph[i][0][0]},{room_graph[i][0][1]})",i, room_graph[i][0][0], room_graph[i][0][1])
-        self.room_grid = []
-        grid_size += 1
-        self.grid_size = grid_size
-        for i in range(0, grid_size):
-            self.room_grid.append([None] * grid_size)
-        for room_id in room_graph:
-            room = self.rooms[room_id]
-            self.room_grid[room.x][room.y] = room
-            if 'n' in room_graph[room_id][1]:
-                self.rooms[room_id].connect_rooms('n', self.rooms[room_graph[room_id][1]['n']])
-            if 's' in room_graph[room_id][1]:
-                self.rooms[room_id].connect_rooms('s', self.rooms[room_graph[room_id][1]['s']])
-            if 'e' in room_graph[room_id][1]:
-                self.rooms[room_id].connect_rooms('e', self.rooms[room_graph[room_id][1]['e']])
-            if 'w' in room_graph[room_id][1]:
-                self.rooms[room_id].connect_rooms('w', self.rooms[room_graph[room_id][1]['w']])
+        for room_id, (x, y), exits in rooms:
+            grid_size = max(grid_size, x, y)
+            room = Room(None, None, room_id, x, y)
+            self.rooms[room_id] = room
+            self.room_grid.setdefault(x, {})[y] = room
+            for direction, other_id in exits.items():
+                if other_id in self.rooms:
+                    room.connect_rooms(direction, self.rooms[other_id])
+                else:
+                    pending.setdefault(other_id, []).append((room, direction))
+            for other, direction in pending.pop(room_id, ()):
+                other.connect_rooms(direction, room)
+        if len(pending) > 0:
+            other_id, waiting = next(iter(pending.items()))
+            raise Exception(f"room {waiting[0][0].id} has an exit to missing room {other_id}")
+        self.grid_size = grid_size + 1
         self.starting_room = self.rooms[0]
 
     def print_rooms(self, loop_map, distance):
+        # colorama is only needed to print, not to load or walk a world
+        from colorama import init, deinit, Back
         init()
 
+        # rows from the top (highest y) down, each row from x = 0 up
         rotated_room_grid = []
-        for i in range(0, len(self.room_grid)):
-            rotated_room_grid.append([None] * len(self.room_grid))
-        for i in range(len(self.room_grid)):
-            for j in range(len(self.room_grid[0])):
-                rotated_room_grid[len(self.room_grid[0]) - j - 1][i] = self.room_grid[i][j]
+        for y in range(self.grid_size - 1, -1, -1):
+            rotated_room_grid.append([self.room_grid.get(x, {}).get(y) for x in range(self.grid_size)])
         print("#####")
         str = ""
         for row in rotated_room_grid:
@@ -1,5 +1,13 @@
+import mmap
+import sys
+from array import array
 from collections import deque
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def earliest_ancestor(ancestors, starting_node):
     ancestry = {}
     for parent, child in ancestors:
@@ -27,3 +35,468 @@ def earliest_ancestor(ancestors, starting_node):
                     visited.add(parent)
     
     return max_anc
+
+class AncestryIndex:
+
+    """
+    Precomputed earliest ancestors for every node of a family tree.
+
+    A single topological pass from the oldest generation down stores, for
+    each node, the length of its longest line of ancestry and the ancestor
+    at the end of it (lowest id on ties), so every query is a lookup.
+    That is only the earliest ancestor while each ancestor is reached by
+    one line; nodes with a repeated ancestor are answered by searching the
+    first time they are asked about, and the answer is kept.
+    """
+    def __init__(self, ancestors):
+        self.parents = {}
+        children = {}
+        for parent, child in ancestors:
+            self.parents.setdefault(child, []).append(parent)
+            children.setdefault(parent, []).append(child)
+            self.parents.setdefault(parent, [])
+
+        # maps each node to (depth, earliest ancestor)
+        self.earliest = {}
+        # nodes in topological order, oldest first
+        self.order = []
+        # ancestry structure for is_ancestor and common ancestor queries,
+        # only built when one of them is first asked
+        self.common = None
+        # nodes with an ancestor reachable by more than one line, and the
+        # searched answers for those asked about so far
+        self.repeated = set()
+        self.searched = {}
+        waiting = {node: len(parents) for node, parents in self.parents.items()}
+        q = deque(node for node, count in waiting.items() if count == 0)
+        while len(q) > 0:
+            node = q.popleft()
+            best_lvl, best_anc = 0, node
+            for parent in self.parents[node]:
+                lvl, anc = self.earliest[parent]
+                lvl += 1
+                if lvl > best_lvl or (lvl == best_lvl and anc < best_anc):
+                    best_lvl, best_anc = lvl, anc
+            self.earliest[node] = (best_lvl, best_anc)
+            if any(parent in self.repeated for parent in self.parents[node]):
+                self.repeated.add(node)
+            elif len(self.parents[node]) > 1 and self._lines_meet(node):
+                self.repeated.add(node)
+            self.order.append(node)
+            for child in children.get(node, ()):
+                waiting[child] -= 1
+                if waiting[child] == 0:
+                    q.append(child)
+
+        if len(self.earliest) < len(self.parents):
+            raise Exception("ancestry contains a cycle")
+
+    def earliest_ancestor(self, starting_node):
+        """
+        Return the furthest ancestor of starting_node, or -1 if it has
+        no parents.
+        """
+        if starting_node not in self.earliest:
+            return -1
+        if starting_node in self.repeated:
+            if starting_node not in self.searched:
+                self.searched[starting_node] = self._earliest_by_search(starting_node)
+            return self.searched[starting_node]
+        lvl, anc = self.earliest[starting_node]
+        return anc if lvl > 0 else -1
+
+    def _lines_meet(self, node):
+        # the parents' own lines never repeat, so walking up from node
+        # reaches some ancestor twice only if two parents' lines meet
+        seen = set()
+        stack = list(self.parents[node])
+        while len(stack) > 0:
+            anc = stack.pop()
+            if anc in seen:
+                return True
+            seen.add(anc)
+            stack.extend(self.parents[anc])
+        return False
+
+    def _earliest_by_search(self, starting_node):
+        visited = set(self.parents[starting_node])
+        q = deque((x, 1) for x in self.parents[starting_node])
+        max_anc, max_lvl = -1, -1
+        while len(q) > 0:
+            anc, lvl = q.popleft()
+            if len(self.parents[anc]) == 0:
+                if lvl > max_lvl:
+                    max_anc, max_lvl = anc, lvl
+                elif lvl == max_lvl:
+                    max_anc = min(anc, max_anc)
+            else:
+                for parent in self.parents[anc]:
+                    if parent not in visited:
+                        q.append((parent, lvl + 1))
+                        visited.add(parent)
+
+        return max_anc
+
+    def common_ancestors(self):
+        """
+        Return the structure answering is_ancestor and common ancestor
+        queries, building it on first use: binary lifting when every
+        node has at most one parent, ancestor bitsets otherwise.
+        """
+        if self.common is None:
+            if all(len(parents) <= 1 for parents in self.parents.values()):
+                self.common = AncestorLifting(self.parents, self.order)
+            else:
+                self.common = AncestorBitsets(self.parents, self.order)
+        return self.common
+
+    def is_ancestor(self, ancestor, node):
+        """
+        Return True if ancestor is a (strict) ancestor of node.
+        """
+        return self.common_ancestors().is_ancestor(ancestor, node)
+
+    def ancestors(self, node):
+        """
+        Return the set of all ancestors of node.
+        """
+        return self.common_ancestors().ancestors(node)
+
+    def ancestors_within(self, node, generations):
+        """
+        Return the set of ancestors of node at most the given number of
+        generations back.
+        """
+        found = set()
+        frontier = [node]
+        for _ in range(generations):
+            next_frontier = []
+            for child in frontier:
+                for parent in self.parents.get(child, ()):
+                    if parent not in found:
+                        found.add(parent)
+                        next_frontier.append(parent)
+            frontier = next_frontier
+        return found
+
+    def lowest_common_ancestors(self, node_a, node_b):
+        """
+        Return the sorted list of shared ancestors of node_a and node_b
+        that have no descendant which is also shared. A node counts as
+        its own ancestor here, so if node_a is an ancestor of node_b the
+        result is [node_a].
+        """
+        return self.common_ancestors().lowest_common_ancestors(node_a, node_b)
+
+    def closest_common_ancestor(self, node_a, node_b):
+        """
+        Return the lowest id among the lowest common ancestors of node_a
+        and node_b, or -1 if they share no ancestor.
+        """
+        lowest = self.lowest_common_ancestors(node_a, node_b)
+        return lowest[0] if len(lowest) > 0 else -1
+
+    def closest_common_ancestors(self, pairs):
+        """
+        Return closest_common_ancestor for each (node_a, node_b) pair.
+        """
+        return [self.closest_common_ancestor(a, b) for a, b in pairs]
+
+class AncestorBitsets:
+
+    """
+    Ancestor sets for any family tree, as integer bitsets.
+
+    Nodes are numbered by their position in a topological order, and
+    ancestor_bits[node] has bit i set when the node at position i is an
+    ancestor. Memory grows with the number of nodes times their number of
+    ancestors, so AncestorLifting is used instead where it applies.
+    """
+    def __init__(self, parents, order):
+        self.order = order
+        self.position = {}
+        self.ancestor_bits = {}
+        for node in order:
+            bits = 0
+            for parent in parents[node]:
+                bits |= self.ancestor_bits[parent] | (1 << self.position[parent])
+            self.ancestor_bits[node] = bits
+            self.position[node] = len(self.position)
+
+    def _nodes(self, bits):
+        nodes = []
+        while bits:
+            low = bits & -bits
+            nodes.append(self.order[low.bit_length() - 1])
+            bits ^= low
+        return nodes
+
+    def is_ancestor(self, ancestor, node):
+        if ancestor not in self.position or node not in self.position:
+            return False
+        return (self.ancestor_bits[node] >> self.position[ancestor]) & 1 == 1
+
+    def ancestors(self, node):
+        return set(self._nodes(self.ancestor_bits.get(node, 0)))
+
+    def lowest_common_ancestors(self, node_a, node_b):
+        if node_a not in self.position or node_b not in self.position:
+            return []
+        common = ((self.ancestor_bits[node_a] | (1 << self.position[node_a]))
+                  & (self.ancestor_bits[node_b] | (1 << self.position[node_b])))
+        dominated = 0
+        for shared in self._nodes(common):
+            dominated |= self.ancestor_bits[shared]
+        return sorted(self._nodes(common & ~dominated))
+
+class AncestorLifting:
+
+    """
+    Binary lifting table for family trees where every node has at most
+    one parent.
+
+    up[k][i] is the position of the ancestor 2 ** k generations above the
+    node at position i (-1 past the oldest generation), so any ancestor
+    or lowest common ancestor is found in O(log depth) jumps.
+    """
+    def __init__(self, parents, order):
+        self.order = order
+        self.position = {node: i for i, node in enumerate(order)}
+        self.depth = array('q', [0]) * len(order)
+        up = array('q', [-1]) * len(order)
+        for i, node in enumerate(order):
+            if len(parents[node]) > 0:
+                up[i] = self.position[parents[node][0]]
+                self.depth[i] = self.depth[up[i]] + 1
+        self.up = [up]
+        while (1 << len(self.up)) <= max(self.depth, default=0):
+            last = self.up[-1]
+            self.up.append(array('q', (last[j] if j >= 0 else -1 for j in last)))
+
+    def _lift(self, i, generations):
+        k = 0
+        while generations > 0 and i >= 0:
+            if generations & 1:
+                i = self.up[k][i]
+            generations >>= 1
+            k += 1
+        return i
+
+    def is_ancestor(self, ancestor, node):
+        if ancestor not in self.position or node not in self.position:
+            return False
+        a, i = self.position[ancestor], self.position[node]
+        if self.depth[a] >= self.depth[i]:
+            return False
+        return self._lift(i, self.depth[i] - self.depth[a]) == a
+
+    def ancestors(self, node):
+        found = set()
+        i = self.up[0][self.position[node]] if node in self.position else -1
+        while i >= 0:
+            found.add(self.order[i])
+            i = self.up[0][i]
+        return found
+
+    def lowest_common_ancestors(self, node_a, node_b):
+        if node_a not in self.position or node_b not in self.position:
+            return []
+        a, b = self.position[node_a], self.position[node_b]
+        if self.depth[a] < self.depth[b]:
+            a, b = b, a
+        a = self._lift(a, self.depth[a] - self.depth[b])
+        if a != b:
+            for k in range(len(self.up) - 1, -1, -1):
+                if self.up[k][a] != self.up[k][b]:
+                    a, b = self.up[k][a], self.up[k][b]
+            a = self.up[0][a]
+        return [self.order[a]] if a >= 0 else []
+
+def read_csv_chunks(path, chunk_size=65536):
+    """
+    Stream "parent,child" lines from a text file, yielding
+    (parents, children) integer arrays of up to chunk_size pairs.
+    A non-numeric first line is skipped as a header.
+    """
+    parents, children = array('q'), array('q')
+    with open(path, 'r') as f:
+        for line_number, line in enumerate(f):
+            line = line.strip()
+            if len(line) == 0:
+                continue
+            parent, child = line.split(',')
+            try:
+                parents.append(int(parent))
+                children.append(int(child))
+            except ValueError:
+                if line_number == 0:
+                    continue
+                raise
+            if len(parents) == chunk_size:
+                yield parents, children
+                parents, children = array('q'), array('q')
+    if len(parents) > 0:
+        yield parents, children
+
+def write_binary_pairs(pairs, path):
+    """
+    Write (parent, child) pairs to path as interleaved little-endian
+    64 bit integers, the format read by read_binary_chunks.
+    """
+    with open(path, 'wb') as f:
+        buffer = array('q')
+        for parent, child in pairs:
+            buffer.append(parent)
+            buffer.append(child)
+            if len(buffer) >= 131072:
+                _write_little_endian(buffer, f)
+                buffer = array('q')
+        _write_little_endian(buffer, f)
+
+def _write_little_endian(buffer, f):
+    if sys.byteorder != 'little':
+        buffer.byteswap()
+    buffer.tofile(f)
+
+def read_binary_chunks(path, chunk_size=65536):
+    """
+    Memory-map a file written by write_binary_pairs, yielding
+    (parents, children) integer views of up to chunk_size pairs
+    (byte-swapped copies on big-endian machines).
+    """
+    with open(path, 'rb') as f:
+        size = f.seek(0, 2)
+        if size % 16 != 0:
+            raise Exception(f"'{path}' is truncated or not a file of pairs")
+        if size == 0:
+            return
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(data).cast('q')
+    for start in range(0, len(view), 2 * chunk_size):
+        chunk = view[start:start + 2 * chunk_size]
+        if sys.byteorder != 'little':
+            chunk = array('q', chunk)
+            chunk.byteswap()
+        yield chunk[0::2], chunk[1::2]
+
+class ParentTable:
+
+    """
+    Compact child -> parents table for integer node ids.
+
+    The parents of node i are parents[offsets[i]:offsets[i + 1]]. It is
+    built from (parents, children) chunks so the input never has to exist
+    as a list of Python tuples.
+    """
+    def __init__(self, chunks):
+        all_parents, all_children = array('q'), array('q')
+        for parents, children in chunks:
+            all_parents.extend(parents)
+            all_children.extend(children)
+        num_nodes = max(max(all_parents, default=-1), max(all_children, default=-1)) + 1
+
+        # counting sort of the pairs by child
+        self.offsets = array('q', [0]) * (num_nodes + 1)
+        for child in all_children:
+            self.offsets[child + 1] += 1
+        for i in range(num_nodes):
+            self.offsets[i + 1] += self.offsets[i]
+        self.parents = array('q', [0]) * len(all_parents)
+        cursor = self.offsets[:-1]
+        for parent, child in zip(all_parents, all_children):
+            self.parents[cursor[child]] = parent
+            cursor[child] += 1
+
+    @classmethod
+    def from_pairs(cls, ancestors):
+        """
+        Build a table from an iterable of (parent, child) pairs.
+        """
+        parents, children = array('q'), array('q')
+        for parent, child in ancestors:
+            parents.append(parent)
+            children.append(child)
+        return cls([(parents, children)])
+
+    def get_parents(self, node):
+        if node < 0 or node + 1 >= len(self.offsets):
+            return self.parents[0:0]
+        return self.parents[self.offsets[node]:self.offsets[node + 1]]
+
+    def earliest_ancestor(self, starting_node):
+        """
+        Same as earliest_ancestor, reading parents from the table.
+        """
+        start_parents = self.get_parents(starting_node)
+        if len(start_parents) == 0:
+            return -1
+
+        visited = set(start_parents)
+        q = deque((x, 1) for x in start_parents)
+        max_anc, max_lvl = -1, -1
+        while len(q) > 0:
+            anc, lvl = q.popleft()
+            anc_parents = self.get_parents(anc)
+            if len(anc_parents) == 0:
+                if lvl > max_lvl:
+                    max_anc, max_lvl = anc, lvl
+                elif lvl == max_lvl:
+                    max_anc = min(anc, max_anc)
+            else:
+                for parent in anc_parents:
+                    if parent not in visited:
+                        q.append((parent, lvl + 1))
+                        visited.add(parent)
+
+        return max_anc
+
+    def earliest_ancestor_by_level(self, starting_node):
+        """
+        Same as earliest_ancestor, but expands a whole generation at a
+        time. With NumPy installed each generation is a vectorized
+        gather and unique over the table arrays.
+        """
+        if len(self.get_parents(starting_node)) == 0:
+            return -1
+        if np is None:
+            return self._earliest_by_level_sets(starting_node)
+
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        parents = np.frombuffer(self.parents, dtype=np.int64)
+        visited = np.zeros(len(offsets) - 1, dtype=bool)
+        frontier = np.array([starting_node], dtype=np.int64)
+        max_anc = -1
+        while len(frontier) > 0:
+            starts = offsets[frontier]
+            counts = offsets[frontier + 1] - starts
+            # nodes without parents end a line; the deepest ones win
+            roots = frontier[counts == 0]
+            if len(roots) > 0:
+                max_anc = int(roots.min())
+            # gather every parent of the frontier into one array
+            total = int(counts.sum())
+            shift = np.repeat(starts - np.cumsum(counts) + counts, counts)
+            gathered = np.unique(parents[shift + np.arange(total)])
+            frontier = gathered[~visited[gathered]]
+            visited[frontier] = True
+        return max_anc
+
+    def _earliest_by_level_sets(self, starting_node):
+        visited = {starting_node}
+        frontier = [starting_node]
+        max_anc = -1
+        while len(frontier) > 0:
+            roots = []
+            next_frontier = []
+            for node in frontier:
+                node_parents = self.get_parents(node)
+                if len(node_parents) == 0:
+                    roots.append(node)
+                for parent in node_parents:
+                    if parent not in visited:
+                        visited.add(parent)
+                        next_frontier.append(parent)
+            if len(roots) > 0:
+                max_anc = min(roots)
+            frontier = next_frontier
+        return max_anc
@@ -1,5 +1,10 @@
 import unittest
-from ancestor import earliest_ancestor
+import os
+import tempfile
+import ancestor
+from ancestor import earliest_ancestor, AncestryIndex, AncestorBitsets, AncestorLifting, ParentTable, read_csv_chunks, read_binary_chunks, write_binary_pairs
+
+test_ancestors = [(1, 3), (2, 3), (3, 6), (5, 6), (5, 7), (4, 5), (4, 8), (8, 9), (11, 8), (10, 1)]
 
 class Test(unittest.TestCase):
 
@@ -13,7 +18,6 @@ class Test(unittest.TestCase):
         6   7   9
     '''
     def test_earliest_ancestor(self):
-        test_ancestors = [(1, 3), (2, 3), (3, 6), (5, 6), (5, 7), (4, 5), (4, 8), (8, 9), (11, 8), (10, 1)]
         self.assertEqual(earliest_ancestor(test_ancestors, 1), 10)
         self.assertEqual(earliest_ancestor(test_ancestors, 2), -1)
         self.assertEqual(earliest_ancestor(test_ancestors, 3), 10)
@@ -26,5 +30,105 @@ class Test(unittest.TestCase):
         self.assertEqual(earliest_ancestor(test_ancestors, 10), -1)
         self.assertEqual(earliest_ancestor(test_ancestors, 11), -1)
 
+    def test_ancestry_index(self):
+        index = AncestryIndex(test_ancestors)
+        for node in range(1, 13):
+            self.assertEqual(index.earliest_ancestor(node), earliest_ancestor(test_ancestors, node))
+
+    def test_ancestry_index_repeated_ancestor(self):
+        # 1 reaches 3 both directly and through 2
+        repeated_ancestors = [(1, 2), (2, 3), (1, 3), (0, 3)]
+        index = AncestryIndex(repeated_ancestors)
+        for node in range(0, 5):
+            self.assertEqual(index.earliest_ancestor(node), earliest_ancestor(repeated_ancestors, node))
+        self.assertEqual(index.earliest_ancestor(3), 0)
+        # only node 3 needs a search, and its answer is kept
+        self.assertSetEqual(index.repeated, {3})
+        self.assertDictEqual(index.searched, {3: 0})
+
+    def test_ancestor_sets(self):
+        index = AncestryIndex(test_ancestors)
+        self.assertSetEqual(index.ancestors(6), {1, 2, 3, 4, 5, 10})
+        self.assertSetEqual(index.ancestors(10), set())
+        self.assertSetEqual(index.ancestors_within(6, 1), {3, 5})
+        self.assertSetEqual(index.ancestors_within(6, 2), {1, 2, 3, 4, 5})
+        self.assertTrue(index.is_ancestor(10, 6))
+        self.assertFalse(index.is_ancestor(6, 10))
+
+    def test_closest_common_ancestor(self):
+        index = AncestryIndex(test_ancestors)
+        self.assertListEqual(index.lowest_common_ancestors(6, 7), [5])
+        self.assertListEqual(index.lowest_common_ancestors(7, 9), [4])
+        self.assertListEqual(index.lowest_common_ancestors(3, 6), [3])
+        self.assertListEqual(index.closest_common_ancestors([(6, 7), (7, 9), (1, 2), (6, 12)]), [5, 4, -1, -1])
+
+    def test_common_ancestors_built_on_demand(self):
+        index = AncestryIndex(test_ancestors)
+        index.earliest_ancestor(6)
+        self.assertIsNone(index.common)
+        self.assertIsInstance(index.common_ancestors(), AncestorBitsets)
+
+    def test_ancestor_lifting(self):
+        # every node has at most one parent
+        tree = [(1, 2), (1, 3), (2, 4), (2, 5), (4, 6), (3, 7), (8, 9)]
+        index = AncestryIndex(tree)
+        self.assertIsInstance(index.common_ancestors(), AncestorLifting)
+        bitsets = AncestorBitsets(index.parents, index.order)
+        for node_a in range(0, 11):
+            self.assertSetEqual(index.ancestors(node_a), bitsets.ancestors(node_a))
+            for node_b in range(0, 11):
+                self.assertEqual(index.is_ancestor(node_a, node_b), bitsets.is_ancestor(node_a, node_b))
+                self.assertListEqual(index.lowest_common_ancestors(node_a, node_b),
+                                     bitsets.lowest_common_ancestors(node_a, node_b))
+        self.assertListEqual(index.lowest_common_ancestors(6, 5), [2])
+        self.assertListEqual(index.lowest_common_ancestors(6, 7), [1])
+        self.assertListEqual(index.lowest_common_ancestors(6, 9), [])
+
+    def test_ancestry_index_cycle(self):
+        self.assertRaises(Exception, AncestryIndex, [(1, 2), (2, 3), (3, 1)])
+
+    def test_parent_table(self):
+        table = ParentTable.from_pairs(test_ancestors)
+        for node in range(0, 13):
+            self.assertEqual(table.earliest_ancestor(node), earliest_ancestor(test_ancestors, node))
+
+    def test_earliest_ancestor_by_level(self):
+        table = ParentTable.from_pairs(test_ancestors)
+        for node in range(0, 13):
+            self.assertEqual(table.earliest_ancestor_by_level(node), earliest_ancestor(test_ancestors, node))
+
+    def test_earliest_ancestor_by_level_without_numpy(self):
+        table = ParentTable.from_pairs(test_ancestors)
+        np_ = ancestor.np
+        ancestor.np = None
+        try:
+            for node in range(0, 13):
+                self.assertEqual(table.earliest_ancestor_by_level(node), earliest_ancestor(test_ancestors, node))
+        finally:
+            ancestor.np = np_
+
+    def test_streaming_loaders(self):
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "ancestors.csv")
+            with open(csv_path, 'w') as f:
+                f.write("parent,child\n")
+                f.writelines(f"{p},{c}\n" for p, c in test_ancestors)
+            chunks = list(read_csv_chunks(csv_path, chunk_size=4))
+            self.assertEqual(len(chunks), 3)
+            self.assertListEqual([(p, c) for ps, cs in chunks for p, c in zip(ps, cs)], test_ancestors)
+
+            binary_path = os.path.join(directory, "ancestors.bin")
+            write_binary_pairs(test_ancestors, binary_path)
+            table = ParentTable(read_binary_chunks(binary_path, chunk_size=3))
+            for node in range(1, 12):
+                self.assertEqual(table.earliest_ancestor(node), earliest_ancestor(test_ancestors, node))
+
+            with open(binary_path, 'rb') as f:
+                data = f.read()
+            self.assertEqual(data[:16], (1).to_bytes(8, 'little') + (3).to_bytes(8, 'little'))
+            with open(binary_path, 'wb') as f:
+                f.write(data[:-8])
+            self.assertRaises(Exception, list, read_binary_chunks(binary_path))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,41 @@
+"""
+Micro-benchmark for util.Queue
+
+Runs a breadth-first traversal over a star graph so the whole graph sits in
+the frontier at once. With an O(1) queue the time per vertex should stay
+roughly flat as the frontier grows.
+"""
+import time
+from graph import Graph
+from util import Queue
+
+def star_graph(size):
+    graph = Graph()
+    for i in range(size + 1):
+        graph.add_vertex(i)
+    for i in range(1, size + 1):
+        graph.add_edge(0, i)
+    return graph
+
+def time_queue(size):
+    q = Queue()
+    start = time.perf_counter()
+    for i in range(size):
+        q.enqueue(i)
+    while q.size() > 0:
+        q.dequeue()
+    return time.perf_counter() - start
+
+def time_bfs(size):
+    graph = star_graph(size)
+    start = time.perf_counter()
+    for _ in graph.iter_bfs(0):
+        pass
+    return time.perf_counter() - start
+
+if __name__ == '__main__':
+    print(f"{'size':>10} {'queue ns/op':>12} {'bfs ns/vertex':>14}")
+    for size in [10 ** 4, 10 ** 5, 10 ** 6]:
+        queue_time = time_queue(size)
+        bfs_time = time_bfs(size)
+        print(f"{size:>10} {queue_time / size * 1e9:>12.1f} {bfs_time / size * 1e9:>14.1f}")
@@ -1,20 +1,79 @@
 """
 Simple graph implementation
 """
-from util import Stack, Queue  # These may come in handy
+import mmap
+import struct
+import sys
+from array import array
+from multiprocessing import Pool
+from util import Stack, Queue, LRUCache  # These may come in handy
 
 class Graph:
 
     """Represent a graph as a dictionary of vertices mapping labels to edges."""
+    # recursive searches switch to an explicit stack past this depth
+    max_recursion_depth = 500
+    # LRU cache of breadth-first parent trees keyed by source, see enable_bfs_cache
+    bfs_cache = None
+    # precomputed transitive closure, see enable_reachability_index
+    reachability = None
+
     def __init__(self):
         self.vertices = {}
-        self.visited_cache = set()
+        # reverse adjacency, maps each vertex to the vertices with edges into it
+        self.reverse = {}
+
+    @classmethod
+    def from_edges(cls, edges, vertices=None):
+        """
+        Build a graph from an iterable of (v1, v2) directed edges.
+
+        If vertices is given, every edge endpoint must be one of them;
+        this is checked once after all edges are loaded rather than per
+        edge. Otherwise vertices are created as they are seen.
+        """
+        graph = cls()
+        if vertices is not None:
+            for vertex_id in vertices:
+                graph.vertices[vertex_id] = set()
+                graph.reverse[vertex_id] = set()
+            vertices = set(graph.vertices)
+        for v1, v2 in edges:
+            out_edges = graph.vertices.get(v1)
+            if out_edges is None:
+                out_edges = graph.vertices[v1] = set()
+                graph.reverse.setdefault(v1, set())
+            out_edges.add(v2)
+            in_edges = graph.reverse.get(v2)
+            if in_edges is None:
+                in_edges = graph.reverse[v2] = set()
+            in_edges.add(v1)
+        if vertices is not None:
+            for vertex_id in graph.vertices.keys() | graph.reverse.keys():
+                if vertex_id not in vertices:
+                    raise Exception(f"node '{vertex_id}' not found in graph")
+        for v2 in graph.reverse:
+            if v2 not in graph.vertices:
+                graph.vertices[v2] = set()
+        return graph
 
     def add_vertex(self, vertex_id):
         """
         Add a vertex to the graph.
         """
+        removed = self.vertices.get(vertex_id, set())
+        if vertex_id in self.vertices:
+            self._invalidate_bfs_cache(vertex_id)
+        for v2 in removed:
+            self.reverse[v2].discard(vertex_id)
         self.vertices[vertex_id] = set()
+        self.reverse.setdefault(vertex_id, set())
+        if self.reachability is not None:
+            if len(removed) > 0:
+                # edges were removed, which the index cannot repair
+                self.enable_reachability_index()
+            else:
+                self.reachability.add_vertex(vertex_id)
 
     def add_edge(self, v1, v2):
         """
@@ -22,7 +81,11 @@ class Graph:
         """
         if v2 not in self.vertices:
             raise Exception(f"node '{v2}' not found in graph")
+        self._invalidate_bfs_cache(v1)
         self.vertices[v1].add(v2)
+        self.reverse[v2].add(v1)
+        if self.reachability is not None:
+            self.reachability.add_edge(v1, v2)
 
     def get_neighbors(self, vertex_id):
         """
@@ -30,69 +93,169 @@ class Graph:
         """
         return self.vertices[vertex_id]
 
-    def bft(self, starting_vertex):
+    def get_reverse_neighbors(self, vertex_id):
         """
-        Print each vertex in breadth-first order
-        beginning from starting_vertex.
+        Get all vertices with an edge leading into a vertex.
+        """
+        return self.reverse[vertex_id]
+
+    def enable_bfs_cache(self, maxsize=128):
+        """
+        Cache the breadth-first parent trees of up to maxsize sources so
+        repeated bfs calls from the same vertex skip the search.
+        """
+        self.bfs_cache = LRUCache(maxsize)
+
+    def _invalidate_bfs_cache(self, vertex_id):
+        # a change to the edges leaving vertex_id can only affect
+        # trees that reach it
+        if self.bfs_cache is not None:
+            for start, tree in self.bfs_cache.items():
+                if vertex_id in tree:
+                    self.bfs_cache.remove(start)
+
+    def bfs_tree(self, starting_vertex):
+        """
+        Return a dictionary mapping every vertex reachable from
+        starting_vertex to its parent in a breadth-first search.
+        """
+        if self.bfs_cache is not None:
+            tree = self.bfs_cache.get(starting_vertex)
+            if tree is not None:
+                return tree
+        tree = {v: parent for v, _, parent in self.iter_bfs(starting_vertex)}
+        if self.bfs_cache is not None:
+            self.bfs_cache.put(starting_vertex, tree)
+        return tree
+
+    def enable_reachability_index(self):
+        """
+        Precompute which vertices can reach each other so reachable
+        answers without searching. The index is kept up to date as
+        vertices and edges are added.
+        """
+        self.reachability = ReachabilityIndex(self)
+
+    def reachable(self, starting_vertex, destination_vertex):
+        """
+        Return True if there is a path from starting_vertex to
+        destination_vertex.
+        """
+        if self.reachability is not None:
+            return self.reachability.reachable(starting_vertex, destination_vertex)
+        return self._bidirectional_bfs(starting_vertex, destination_vertex) is not None
+
+    def iter_bfs(self, starting_vertex):
+        """
+        Yield (vertex, depth, parent) for each vertex in breadth-first
+        order beginning from starting_vertex.
         """
         q = Queue()
         visited = set()
-        q.enqueue(starting_vertex)
+        q.enqueue((starting_vertex, 0, None))
         visited.add(starting_vertex)
         while q.size() > 0:
-            name = q.dequeue()
-            print(name)
+            item = q.dequeue()
+            yield item
+            name, depth = item[0], item[1]
             for neighbor in self.get_neighbors(name):
                 if neighbor not in visited:
-                    q.enqueue(neighbor)
+                    q.enqueue((neighbor, depth + 1, name))
                     visited.add(neighbor)
 
-    def dft(self, starting_vertex):
+    def iter_dfs(self, starting_vertex):
         """
-        Print each vertex in depth-first order
-        beginning from starting_vertex.
+        Yield (vertex, depth, parent) for each vertex in depth-first
+        order beginning from starting_vertex.
         """
         s = Stack()
         visited = set()
-        s.push(starting_vertex)
+        s.push((starting_vertex, 0, None))
         visited.add(starting_vertex)
         while s.size() > 0:
-            name = s.pop()
-            print(name)
+            item = s.pop()
+            yield item
+            name, depth = item[0], item[1]
             for neighbor in self.get_neighbors(name):
                 if neighbor not in visited:
-                    s.push(neighbor)
+                    s.push((neighbor, depth + 1, name))
                     visited.add(neighbor)
 
+    def bft(self, starting_vertex):
+        """
+        Print each vertex in breadth-first order
+        beginning from starting_vertex.
+        """
+        for name, _, _ in self.iter_bfs(starting_vertex):
+            print(name)
+
+    def dft(self, starting_vertex):
+        """
+        Print each vertex in depth-first order
+        beginning from starting_vertex.
+        """
+        for name, _, _ in self.iter_dfs(starting_vertex):
+            print(name)
 
-    def dft_recursive(self, starting_vertex):
+    def dft_recursive(self, starting_vertex, visited=None, depth=0):
         """
         Print each vertex in depth-first order
         beginning from starting_vertex.
 
         This should be done using recursion.
         """
+        if visited is None:
+            visited = set()
+        if depth >= self.max_recursion_depth:
+            # too deep for the interpreter stack, finish iteratively
+            for name in self._dft_iterative(starting_vertex, visited):
+                print(name)
+            return
         print(starting_vertex)
-        if len(self.visited_cache) == 0:
-            self.visited_cache.add(starting_vertex)
-            for neighbor in self.get_neighbors(starting_vertex):
-                if neighbor not in self.visited_cache:
-                    self.dft_recursive(neighbor)
-            # clear cache since this case must have been the initial case
-            # our cache needs to be clear for future calls
-            self.visited_cache.clear()
-        else:
-            self.visited_cache.add(starting_vertex)
-            for neighbor in self.get_neighbors(starting_vertex):
-                if neighbor not in self.visited_cache:
-                    self.dft_recursive(neighbor)
+        visited.add(starting_vertex)
+        for neighbor in self.get_neighbors(starting_vertex):
+            if neighbor not in visited:
+                self.dft_recursive(neighbor, visited, depth + 1)
 
-    def bfs(self, starting_vertex, destination_vertex):
+    def _dft_iterative(self, starting_vertex, visited):
+        """
+        Yield vertices in the same order as dft_recursive, keeping
+        the pending neighbor iterators on an explicit stack.
+        """
+        visited.add(starting_vertex)
+        yield starting_vertex
+        stack = [iter(self.get_neighbors(starting_vertex))]
+        while len(stack) > 0:
+            for neighbor in stack[-1]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    yield neighbor
+                    stack.append(iter(self.get_neighbors(neighbor)))
+                    break
+            else:
+                stack.pop()
+
+    def bfs(self, starting_vertex, destination_vertex, bidirectional=False):
         """
         Return a list containing the shortest path from
         starting_vertex to destination_vertex in
         breath-first order.
+
+        With bidirectional=True the search grows from both ends
+        and stops where the two frontiers meet.
         """
+        if bidirectional:
+            return self._bidirectional_bfs(starting_vertex, destination_vertex)
+        if self.bfs_cache is not None:
+            tree = self.bfs_tree(starting_vertex)
+            if destination_vertex not in tree:
+                return None
+            path = []
+            cur = destination_vertex
+            while cur is not None:
+                path.append(cur)
+                cur = tree[cur]
+            return list(reversed(path))
         q = Queue()
         # map of node names to their parent
         # also used to keep track of visited nodes
@@ -107,7 +270,7 @@ class Graph:
             if name == destination_vertex:
                 path = []
                 cur = name
-                while cur:
+                while cur is not None:
                     path.append(cur)
                     cur = visited[cur]
 
@@ -120,6 +283,113 @@ class Graph:
 
         return None
 
+    def paths_from(self, starting_vertex, destinations):
+        """
+        Return a dictionary mapping each of the destinations to its
+        shortest path from starting_vertex (None if unreachable),
+        using a single breadth-first search.
+        """
+        remaining = set(destinations)
+        q = Queue()
+        visited = {starting_vertex: None}
+        q.enqueue(starting_vertex)
+        remaining.discard(starting_vertex)
+        while q.size() > 0 and len(remaining) > 0:
+            name = q.dequeue()
+            for neighbor in self.get_neighbors(name):
+                if neighbor not in visited:
+                    q.enqueue(neighbor)
+                    visited[neighbor] = name
+                    remaining.discard(neighbor)
+
+        paths = {}
+        for destination in destinations:
+            if destination not in visited:
+                paths[destination] = None
+                continue
+            path = []
+            cur = destination
+            while cur is not None:
+                path.append(cur)
+                cur = visited[cur]
+            paths[destination] = list(reversed(path))
+        return paths
+
+    def bfs_many(self, queries, processes=None):
+        """
+        Return a list of shortest paths, one per (starting_vertex,
+        destination_vertex) pair in queries.
+
+        Queries are grouped so each distinct starting vertex is searched
+        once. If processes is given, the searches are spread over a
+        process pool sharing a frozen copy of the graph. With a start
+        method other than fork, each worker receives its own copy, or
+        maps the file again for a graph from FrozenGraph.load.
+        """
+        queries = list(queries)
+        by_source = {}
+        for start, end in queries:
+            by_source.setdefault(start, set()).add(end)
+
+        if processes is None:
+            results = {start: self.paths_from(start, ends) for start, ends in by_source.items()}
+        else:
+            graph = self if isinstance(self, FrozenGraph) else self.freeze()
+            with Pool(processes, initializer=_init_worker, initargs=(graph,)) as pool:
+                results = dict(pool.imap_unordered(_paths_worker, by_source.items()))
+
+        return [results[start][end] for start, end in queries]
+
+    def _bidirectional_bfs(self, starting_vertex, destination_vertex):
+        """
+        Shortest path search expanding whole levels from whichever
+        end currently has the smaller frontier.
+        """
+        if starting_vertex == destination_vertex:
+            return [starting_vertex]
+        # parent maps, forward points toward the start and backward
+        # points toward the destination
+        forward = {starting_vertex: None}
+        backward = {destination_vertex: None}
+        forward_frontier = [starting_vertex]
+        backward_frontier = [destination_vertex]
+        while len(forward_frontier) > 0 and len(backward_frontier) > 0:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_frontier, meet = self._expand_level(
+                    forward_frontier, forward, backward, self.get_neighbors)
+            else:
+                backward_frontier, meet = self._expand_level(
+                    backward_frontier, backward, forward, self.get_reverse_neighbors)
+            if meet is not None:
+                path = []
+                cur = meet
+                while cur is not None:
+                    path.append(cur)
+                    cur = forward[cur]
+                path.reverse()
+                cur = backward[meet]
+                while cur is not None:
+                    path.append(cur)
+                    cur = backward[cur]
+                return path
+
+        return None
+
+    def _expand_level(self, frontier, parents, other_parents, get_neighbors):
+        """
+        Visit every neighbor of the frontier, returning the next frontier
+        and the first vertex already reached from the other end (if any).
+        """
+        next_frontier = []
+        for name in frontier:
+            for neighbor in get_neighbors(name):
+                if neighbor not in parents:
+                    parents[neighbor] = name
+                    if neighbor in other_parents:
+                        return next_frontier, neighbor
+                    next_frontier.append(neighbor)
+        return next_frontier, None
+
     def dfs(self, starting_vertex, destination_vertex):
         """
         Return a list containing a path from
@@ -137,7 +407,7 @@ class Graph:
             if name == destination_vertex:
                 path = []
                 cur = name
-                while cur:
+                while cur is not None:
                     path.append(cur)
                     cur = visited[cur]
 
@@ -148,7 +418,7 @@ class Graph:
                     s.push(neighbor)
                     visited[neighbor] = name
 
-    def dfs_recursive(self, starting_vertex, destination_vertex):
+    def dfs_recursive(self, starting_vertex, destination_vertex, visited=None, depth=0):
         """
         Return a list containing a path from
         starting_vertex to destination_vertex in
@@ -156,21 +426,362 @@ class Graph:
 
         This should be done using recursion.
         """
+        if visited is None:
+            visited = {starting_vertex}
         if starting_vertex == destination_vertex:
             return [starting_vertex]
-        
+        if depth >= self.max_recursion_depth:
+            # too deep for the interpreter stack, finish iteratively
+            return self._dfs_iterative(starting_vertex, destination_vertex, visited)
+
         for neighbor in self.get_neighbors(starting_vertex):
-            if neighbor not in self.visited_cache:
-                self.visited_cache.add(neighbor)
-                found = self.dfs_recursive(neighbor, destination_vertex)
+            if neighbor not in visited:
+                visited.add(neighbor)
+                found = self.dfs_recursive(neighbor, destination_vertex, visited, depth + 1)
                 if found:
-                    self.visited_cache.clear()
                     found.insert(0, starting_vertex)
                     return found
 
-        self.visited_cache.clear()
         return None
 
+    def _dfs_iterative(self, starting_vertex, destination_vertex, visited):
+        """
+        Search in the same order as dfs_recursive, keeping the
+        current path and its neighbor iterators on explicit stacks.
+        """
+        path = [starting_vertex]
+        stack = [iter(self.get_neighbors(starting_vertex))]
+        while len(stack) > 0:
+            for neighbor in stack[-1]:
+                if neighbor not in visited:
+                    visited.add(neighbor)
+                    path.append(neighbor)
+                    if neighbor == destination_vertex:
+                        return path
+                    stack.append(iter(self.get_neighbors(neighbor)))
+                    break
+            else:
+                stack.pop()
+                path.pop()
+
+        return None
+
+    def freeze(self):
+        """
+        Return a read-only compressed sparse row copy of the graph.
+        """
+        return FrozenGraph(self.vertices)
+
+    def save(self, path):
+        """
+        Write the graph to path in the FrozenGraph binary format.
+        """
+        self.freeze().save(path)
+
+    def weak_components(self):
+        """
+        Return a dictionary mapping each vertex to the id of its weakly
+        connected component. Ids are numbered from 0.
+        """
+        frozen = self.freeze()
+        return dict(zip(frozen.labels, frozen.weak_component_ids()))
+
+    def strong_components(self):
+        """
+        Return a dictionary mapping each vertex to the id of its strongly
+        connected component. Two vertices share an id exactly when each
+        is reachable from the other.
+        """
+        frozen = self.freeze()
+        return dict(zip(frozen.labels, frozen.strong_component_ids()))
+
+class FrozenGraph(Graph):
+
+    """
+    Read-only graph stored in compressed sparse row form.
+
+    Vertex labels are remapped to integer ids; the neighbors of id i are
+    targets[offsets[i]:offsets[i + 1]], and the vertices with edges into
+    it are reverse_targets[reverse_offsets[i]:reverse_offsets[i + 1]].
+    """
+    def __init__(self, vertices):
+        self.labels = list(vertices)
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.offsets = array('q', [0])
+        self.targets = array('q')
+        for label in self.labels:
+            self.targets.extend(self.index[v] for v in vertices[label])
+            self.offsets.append(len(self.targets))
+        self._build_reverse()
+
+    # magic, version, vertex count, edge count, padding to 32 bytes
+    HEADER = struct.Struct('<4sIQQ8x')
+    MAGIC = b'GRPH'
+    VERSION = 1
+
+    def save(self, path):
+        """
+        Write the graph to path as a header followed by the label,
+        offset and target arrays as little-endian 64 bit integers.
+
+        Only integer vertex labels can be saved.
+        """
+        if not all(isinstance(label, int) for label in self.labels):
+            raise Exception("only graphs with integer vertex labels can be saved")
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(self.labels), len(self.targets)))
+            for buffer in [array('q', self.labels), self.offsets, self.targets,
+                           self.reverse_offsets, self.reverse_targets]:
+                if sys.byteorder != 'little':
+                    buffer = array('q', buffer)
+                    buffer.byteswap()
+                f.write(memoryview(buffer).cast('B'))
+
+    @classmethod
+    def load(cls, path):
+        """
+        Memory-map a graph written by save. The arrays are views into
+        the file rather than copies (except on big-endian machines,
+        where they are byte-swapped copies). The graph pickles as its
+        path, so processes it is sent to map the file themselves.
+        """
+        with open(path, 'rb') as f:
+            if f.seek(0, 2) < cls.HEADER.size:
+                raise Exception(f"'{path}' is not a saved graph")
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_vertices, num_edges = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise Exception(f"'{path}' is not a saved graph")
+        sizes = [num_vertices, num_vertices + 1, num_edges, num_vertices + 1, num_edges]
+        if len(data) != cls.HEADER.size + 8 * sum(sizes):
+            raise Exception(f"'{path}' is truncated or corrupt")
+        view = memoryview(data)[cls.HEADER.size:].cast('q')
+        graph = cls.__new__(cls)
+        graph._mmap = data
+        graph.path = path
+        buffers = []
+        start = 0
+        for size in sizes:
+            buffer = view[start:start + size]
+            if sys.byteorder != 'little':
+                buffer = array('q', buffer)
+                buffer.byteswap()
+            buffers.append(buffer)
+            start += size
+        labels, graph.offsets, graph.targets, graph.reverse_offsets, graph.reverse_targets = buffers
+        graph.labels = labels.tolist()
+        graph.index = {label: i for i, label in enumerate(graph.labels)}
+        return graph
+
+    def __reduce_ex__(self, protocol):
+        # an mmap cannot be pickled, so send the path to load it again
+        if getattr(self, '_mmap', None) is not None:
+            return (type(self).load, (self.path,))
+        return super().__reduce_ex__(protocol)
+
+    def _build_reverse(self):
+        # counting sort of the edges by target
+        self.reverse_offsets = array('q', bytes(8 * (len(self.labels) + 1)))
+        for t in self.targets:
+            self.reverse_offsets[t + 1] += 1
+        for i in range(len(self.labels)):
+            self.reverse_offsets[i + 1] += self.reverse_offsets[i]
+        self.reverse_targets = array('q', bytes(8 * len(self.targets)))
+        cursor = self.reverse_offsets[:-1]
+        for i in range(len(self.labels)):
+            for t in self.neighbor_ids(i):
+                self.reverse_targets[cursor[t]] = i
+                cursor[t] += 1
+
+    def weak_component_ids(self):
+        """
+        Return an array giving the weakly connected component of each
+        integer vertex id, found with union-find.
+        """
+        n = len(self.labels)
+        parent = array('q', range(n))
+        size = array('q', [1]) * n
+
+        def find(i):
+            while parent[i] != i:
+                # path halving
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i in range(n):
+            for j in self.neighbor_ids(i):
+                a, b = find(i), find(j)
+                if a != b:
+                    if size[a] < size[b]:
+                        a, b = b, a
+                    parent[b] = a
+                    size[a] += size[b]
+
+        # renumber the roots as 0, 1, 2, ... in order of first appearance
+        component = array('q', [-1]) * n
+        ids = {}
+        for i in range(n):
+            root = find(i)
+            if root not in ids:
+                ids[root] = len(ids)
+            component[i] = ids[root]
+        return component
+
+    def strong_component_ids(self):
+        """
+        Return an array giving the strongly connected component of each
+        integer vertex id, found with an iterative version of Tarjan's
+        algorithm. Components are numbered in reverse topological order,
+        so edges between components always go to a lower id.
+        """
+        n = len(self.labels)
+        index = array('q', [-1]) * n
+        low = array('q', [0]) * n
+        on_stack = bytearray(n)
+        component = array('q', [-1]) * n
+        stack = []
+        counter = 0
+        num_components = 0
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            # explicit call stack of vertices and their next edge position
+            call = [root]
+            position = [self.offsets[root]]
+            while len(call) > 0:
+                v = call[-1]
+                p = position[-1]
+                if p < self.offsets[v + 1]:
+                    position[-1] = p + 1
+                    w = self.targets[p]
+                    if index[w] == -1:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        on_stack[w] = 1
+                        call.append(w)
+                        position.append(self.offsets[w])
+                    elif on_stack[w] and index[w] < low[v]:
+                        low[v] = index[w]
+                else:
+                    call.pop()
+                    position.pop()
+                    if low[v] == index[v]:
+                        while True:
+                            w = stack.pop()
+                            on_stack[w] = 0
+                            component[w] = num_components
+                            if w == v:
+                                break
+                        num_components += 1
+                    if len(call) > 0 and low[v] < low[call[-1]]:
+                        low[call[-1]] = low[v]
+        return component
+
+    def freeze(self):
+        return self
+
+    def add_vertex(self, vertex_id):
+        raise Exception("cannot modify a frozen graph")
+
+    def add_edge(self, v1, v2):
+        raise Exception("cannot modify a frozen graph")
+
+    def neighbor_ids(self, i):
+        """
+        Get the integer ids of all neighbors of integer id i.
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def get_neighbors(self, vertex_id):
+        """
+        Get all neighbors (edges) of a vertex.
+        """
+        return map(self.labels.__getitem__, self.neighbor_ids(self.index[vertex_id]))
+
+    def reverse_neighbor_ids(self, i):
+        """
+        Get the integer ids of all vertices with an edge into integer id i.
+        """
+        return self.reverse_targets[self.reverse_offsets[i]:self.reverse_offsets[i + 1]]
+
+    def get_reverse_neighbors(self, vertex_id):
+        """
+        Get all vertices with an edge leading into a vertex.
+        """
+        return map(self.labels.__getitem__, self.reverse_neighbor_ids(self.index[vertex_id]))
+
+class ReachabilityIndex:
+
+    """
+    Transitive closure of a graph's strongly connected components.
+
+    Each component is given an id, and closure[c] is an integer bitset
+    with bit d set when component d is reachable from component c.
+    """
+    def __init__(self, graph):
+        frozen = graph.freeze()
+        components = frozen.strong_component_ids()
+        self.component = dict(zip(frozen.labels, components))
+        num_components = max(components, default=-1) + 1
+        successors = [set() for _ in range(num_components)]
+        for i in range(len(frozen.labels)):
+            for j in frozen.neighbor_ids(i):
+                if components[i] != components[j]:
+                    successors[components[i]].add(components[j])
+        # components are numbered so edges go to lower ids, so building
+        # up from 0 sees every successor's closure before it is needed
+        self.closure = []
+        for c in range(num_components):
+            bits = 1 << c
+            for d in successors[c]:
+                bits |= self.closure[d]
+            self.closure.append(bits)
+
+    def reachable(self, starting_vertex, destination_vertex):
+        """
+        Return True if destination_vertex is reachable from starting_vertex.
+        """
+        return (self.closure[self.component[starting_vertex]] >> self.component[destination_vertex]) & 1 == 1
+
+    def add_vertex(self, vertex_id):
+        """
+        Give a new vertex its own component.
+        """
+        if vertex_id not in self.component:
+            self.component[vertex_id] = len(self.closure)
+            self.closure.append(1 << len(self.closure))
+
+    def add_edge(self, v1, v2):
+        """
+        Update the closure for a new edge from v1 to v2.
+        """
+        c1, c2 = self.component[v1], self.component[v2]
+        if (self.closure[c1] >> c2) & 1:
+            return
+        # everything that reaches v1 now reaches whatever v2 reaches
+        bits = self.closure[c2]
+        for c in range(len(self.closure)):
+            if (self.closure[c] >> c1) & 1:
+                self.closure[c] |= bits
+
+# graph shared with pool workers, inherited without copying when forked
+# and pickled to each worker otherwise
+_worker_graph = None
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+def _paths_worker(item):
+    start, ends = item
+    return start, _worker_graph.paths_from(start, ends)
+
 if __name__ == '__main__':
     graph = Graph()  # Instantiate your graph
     # https://github.com/LambdaSchool/Graphs/blob/master/objectives/breadth-first-search/img/bfs-visit-order.png
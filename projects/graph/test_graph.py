@@ -1,7 +1,12 @@
 import unittest
 import sys
 import io
-from graph import Graph
+import os
+import pickle
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from graph import Graph, FrozenGraph
+from util import Queue
 
 class Test(unittest.TestCase):
     def setUp(self):
@@ -97,10 +102,179 @@ class Test(unittest.TestCase):
 
         sys.stdout = stdout_  # Restore stdout
 
+    def test_iter_bfs(self):
+        order = list(self.graph.iter_bfs(1))
+        self.assertEqual([v for v, _, _ in order][:2], [1, 2])
+        self.assertEqual(len(order), 7)
+        depths = {v: d for v, d, _ in order}
+        self.assertDictEqual(depths, {1: 0, 2: 1, 3: 2, 4: 2, 5: 3, 6: 3, 7: 3})
+        parents = {v: p for v, _, p in order}
+        self.assertIsNone(parents[1])
+        self.assertEqual(parents[6], 4)
+
+    def test_iter_dfs(self):
+        dft = [
+            [1, 2, 3, 5, 4, 6, 7],
+            [1, 2, 3, 5, 4, 7, 6],
+            [1, 2, 4, 7, 6, 3, 5],
+            [1, 2, 4, 6, 3, 5, 7]
+        ]
+        self.assertIn([v for v, _, _ in self.graph.iter_dfs(1)], dft)
+
+    def test_iter_early_exit(self):
+        it = self.graph.iter_bfs(1)
+        self.assertEqual(next(it), (1, 0, None))
+        self.assertEqual(next(it), (2, 1, 1))
+
+    def test_queue_bulk(self):
+        q = Queue()
+        q.enqueue_many([1, 2, 3])
+        q.enqueue(4)
+        self.assertEqual(q.dequeue(), 1)
+        self.assertListEqual(q.drain(), [2, 3, 4])
+        self.assertEqual(q.size(), 0)
+        self.assertIsNone(q.dequeue())
+
     def test_bfs(self):
         bfs = [1, 2, 4, 6]
         self.assertListEqual(self.graph.bfs(1, 6), bfs)
 
+    def test_bfs_vertex_zero(self):
+        graph = Graph.from_edges([(0, 1), (1, 2)])
+        self.assertListEqual(graph.bfs(0, 2), [0, 1, 2])
+        self.assertListEqual(graph.bfs(0, 2, bidirectional=True), [0, 1, 2])
+        graph.enable_bfs_cache()
+        self.assertListEqual(graph.bfs(0, 2), [0, 1, 2])
+        self.assertListEqual(graph.dfs(0, 2), [0, 1, 2])
+
+    def test_reverse_index(self):
+        self.assertSetEqual(self.graph.get_reverse_neighbors(3), {2, 5, 6})
+        self.assertSetEqual(self.graph.get_reverse_neighbors(1), {7})
+        frozen = self.graph.freeze()
+        for v in self.graph.vertices:
+            self.assertSetEqual(set(frozen.get_reverse_neighbors(v)), self.graph.get_reverse_neighbors(v))
+
+    def test_bidirectional_bfs(self):
+        self.assertListEqual(self.graph.bfs(1, 6, bidirectional=True), [1, 2, 4, 6])
+        self.assertListEqual(self.graph.bfs(1, 1, bidirectional=True), [1])
+        self.assertIsNone(self.graph.bfs(3, 1, bidirectional=True))
+        frozen = self.graph.freeze()
+        for start in self.graph.vertices:
+            for end in self.graph.vertices:
+                path = frozen.bfs(start, end, bidirectional=True)
+                expected = self.graph.bfs(start, end)
+                if expected is None:
+                    self.assertIsNone(path)
+                else:
+                    self.assertEqual(len(path), len(expected))
+                    self.assertEqual((path[0], path[-1]), (start, end))
+
+    def test_bfs_many(self):
+        queries = [(1, 6), (1, 5), (3, 1), (7, 6), (1, 1)]
+        expected = [self.graph.bfs(start, end) for start, end in queries]
+        self.assertListEqual(self.graph.bfs_many(queries), expected)
+        self.assertListEqual(self.graph.bfs_many(queries, processes=2), expected)
+
+    def test_bfs_cache(self):
+        self.graph.enable_bfs_cache(maxsize=2)
+        self.assertListEqual(self.graph.bfs(1, 6), [1, 2, 4, 6])
+        self.assertListEqual(self.graph.bfs(1, 5), [1, 2, 3, 5])
+        self.assertIsNone(self.graph.bfs(3, 1))
+        self.assertEqual(self.graph.bfs_cache.hits, 1)
+        self.assertEqual(self.graph.bfs_cache.misses, 2)
+
+        # the new edge leaves 1, so only the tree rooted at 1 is dropped
+        self.graph.add_edge(1, 6)
+        self.assertEqual(self.graph.bfs_cache.size(), 1)
+        self.assertListEqual(self.graph.bfs(1, 6), [1, 6])
+
+        self.graph.add_vertex(8)
+        self.graph.add_edge(3, 8)
+        self.assertListEqual(self.graph.bfs(1, 8), [1, 2, 3, 8])
+        self.graph.bfs(5, 3)
+        self.assertEqual(self.graph.bfs_cache.size(), 2)
+
+    def test_from_edges(self):
+        edges = [(v1, v2) for v1, v2s in self.graph.vertices.items() for v2 in v2s]
+        graph = Graph.from_edges(iter(edges), vertices=range(1, 8))
+        self.assertDictEqual(graph.vertices, self.graph.vertices)
+        self.assertDictEqual(graph.reverse, self.graph.reverse)
+        graph = Graph.from_edges([(1, 2), (2, 3)])
+        self.assertDictEqual(graph.vertices, {1: {2}, 2: {3}, 3: set()})
+        self.assertRaises(Exception, Graph.from_edges, [(1, 2), (2, 3)], [1, 2])
+        self.assertRaises(Exception, Graph.from_edges, [(9, 1)], [1])
+
+    def test_save_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "graph.bin")
+            self.graph.save(path)
+            loaded = FrozenGraph.load(path)
+            for v, edges in self.graph.vertices.items():
+                self.assertSetEqual(set(loaded.get_neighbors(v)), edges)
+                self.assertSetEqual(set(loaded.get_reverse_neighbors(v)), self.graph.reverse[v])
+            self.assertListEqual(loaded.bfs(1, 6), [1, 2, 4, 6])
+            self.assertListEqual(loaded.bfs(1, 6, bidirectional=True), [1, 2, 4, 6])
+            # mmap backed graphs pickle as their path, for spawned workers
+            copy = pickle.loads(pickle.dumps(loaded))
+            self.assertListEqual(copy.bfs(1, 6), [1, 2, 4, 6])
+            del loaded, copy
+
+            with open(path, 'rb') as f:
+                data = f.read()
+            for size in [0, 16, len(data) - 8]:
+                with open(path, 'wb') as f:
+                    f.write(data[:size])
+                self.assertRaises(Exception, FrozenGraph.load, path)
+
+    def test_weak_components(self):
+        self.graph.add_vertex(8)
+        self.graph.add_vertex(9)
+        self.graph.add_edge(9, 8)
+        components = self.graph.weak_components()
+        self.assertEqual(len(set(components[v] for v in range(1, 8))), 1)
+        self.assertEqual(components[8], components[9])
+        self.assertNotEqual(components[1], components[8])
+
+    def test_strong_components(self):
+        components = self.graph.strong_components()
+        self.assertEqual(len(set(components.values())), 3)
+        self.assertEqual(len(set(components[v] for v in [1, 2, 4, 7])), 1)
+        self.assertEqual(components[3], components[5])
+        self.assertNotEqual(components[3], components[6])
+        self.assertNotEqual(components[1], components[6])
+        # edges between components lead to lower ids
+        self.assertLess(components[3], components[6])
+        self.assertLess(components[6], components[7])
+
+    def test_frozen_components(self):
+        frozen = self.graph.freeze()
+        self.assertDictEqual(frozen.weak_components(), self.graph.weak_components())
+        self.assertDictEqual(frozen.strong_components(), self.graph.strong_components())
+        ids = frozen.strong_component_ids()
+        self.assertListEqual([ids[frozen.index[v]] for v in frozen.labels],
+                             [self.graph.strong_components()[v] for v in frozen.labels])
+
+    def test_reachable(self):
+        self.assertTrue(self.graph.reachable(1, 6))
+        self.assertFalse(self.graph.reachable(3, 1))
+        self.graph.enable_reachability_index()
+        for start in self.graph.vertices:
+            for end in self.graph.vertices:
+                self.assertEqual(self.graph.reachable(start, end), self.graph.bfs(start, end) is not None)
+
+    def test_reachable_incremental(self):
+        self.graph.enable_reachability_index()
+        self.graph.add_vertex(8)
+        self.assertFalse(self.graph.reachable(1, 8))
+        self.graph.add_edge(5, 8)
+        self.assertTrue(self.graph.reachable(1, 8))
+        self.assertFalse(self.graph.reachable(8, 1))
+        self.graph.add_edge(8, 1)
+        self.assertTrue(self.graph.reachable(3, 7))
+        self.graph.add_vertex(8)
+        self.assertFalse(self.graph.reachable(3, 7))
+        self.assertTrue(self.graph.reachable(3, 8))
+
     def test_dfs(self):
         dfs = [
             [1, 2, 4, 6],
@@ -115,5 +289,46 @@ class Test(unittest.TestCase):
         ]
         self.assertIn(self.graph.dfs_recursive(1,6), dfs)
 
+    def test_freeze(self):
+        frozen = self.graph.freeze()
+        self.assertEqual(len(frozen.offsets), 8)
+        self.assertEqual(len(frozen.targets), 10)
+        for v, edges in self.graph.vertices.items():
+            self.assertSetEqual(set(frozen.get_neighbors(v)), edges)
+        self.assertRaises(Exception, frozen.add_edge, 1, 3)
+
+    def test_frozen_search(self):
+        frozen = self.graph.freeze()
+        self.assertListEqual(frozen.bfs(1, 6), [1, 2, 4, 6])
+        self.assertIn(frozen.dfs(1, 6), [[1, 2, 4, 6], [1, 2, 4, 7, 6]])
+        self.assertIn(frozen.dfs_recursive(1, 6), [[1, 2, 4, 6], [1, 2, 4, 7, 6]])
+
+    def test_deep_recursive_search(self):
+        graph = Graph()
+        for i in range(5000):
+            graph.add_vertex(i)
+        for i in range(4999):
+            graph.add_edge(i, i + 1)
+        self.assertListEqual(graph.dfs_recursive(0, 4999), list(range(5000)))
+
+        stdout_ = sys.stdout
+        sys.stdout = io.StringIO()
+        graph.dft_recursive(0)
+        output = sys.stdout.getvalue()
+        sys.stdout = stdout_  # Restore stdout
+
+        self.assertEqual(output, "".join(f"{i}\n" for i in range(5000)))
+
+    def test_concurrent_dfs_recursive(self):
+        dfs = [
+            [1, 2, 4, 6],
+            [1, 2, 4, 7, 6]
+        ]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: self.graph.dfs_recursive(1, 6), range(100)))
+        for result in results:
+            self.assertIn(result, dfs)
+        self.assertIsNone(self.graph.dfs_recursive(3, 1))
+
 if __name__ == '__main__':
     unittest.main()
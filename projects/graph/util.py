@@ -1,15 +1,22 @@
+from collections import deque, OrderedDict
 
-# Note: This Queue class is sub-optimal. Why?
+# deque gives O(1) appends and pops at both ends, unlike list.pop(0)
 class Queue():
     def __init__(self):
-        self.queue = []
+        self.queue = deque()
     def enqueue(self, value):
         self.queue.append(value)
+    def enqueue_many(self, values):
+        self.queue.extend(values)
     def dequeue(self):
         if self.size() > 0:
-            return self.queue.pop(0)
+            return self.queue.popleft()
         else:
             return None
+    def drain(self):
+        items = list(self.queue)
+        self.queue.clear()
+        return items
     def size(self):
         return len(self.queue)
 
@@ -26,3 +33,32 @@ class Stack():
     def size(self):
         return len(self.stack)
 
+
+# Least-recently-used cache with hit/miss counters
+class LRUCache():
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    def get(self, key):
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        else:
+            self.misses += 1
+            return None
+    def put(self, key, value):
+        self.cache[key] = value
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.maxsize:
+            self.cache.popitem(last=False)
+    def remove(self, key):
+        self.cache.pop(key, None)
+    def items(self):
+        return list(self.cache.items())
+    def clear(self):
+        self.cache.clear()
+    def size(self):
+        return len(self.cache)
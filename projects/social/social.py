@@ -1,11 +1,252 @@
+import os
 import random
+from array import array
+import heapq
 from collections import deque
-from math import sqrt, ceil
+from collections.abc import Mapping
+from math import sqrt, ceil, isqrt, log, floor, nan
+from multiprocessing import Pool
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 class User:
     def __init__(self, name):
         self.name = name
 
+class LazyUsers(Mapping):
+
+    """
+    Read-only map of user ids 1..num_users to User objects, creating
+    each User the first time it is looked up.
+    """
+    def __init__(self, num_users):
+        self.num_users = num_users
+        self.created = {}
+
+    def __getitem__(self, user_id):
+        if not (isinstance(user_id, int) and 1 <= user_id <= self.num_users):
+            raise KeyError(user_id)
+        if user_id not in self.created:
+            # populate_graph names users 0..num_users - 1
+            self.created[user_id] = User(user_id - 1)
+        return self.created[user_id]
+
+    def __iter__(self):
+        return iter(range(1, self.num_users + 1))
+
+    def __len__(self):
+        return self.num_users
+
+class CompactFriendships(Mapping):
+
+    """
+    Read-only friendships stored in compressed sparse row form.
+
+    The friends of user i are friends[offsets[i]:offsets[i + 1]], with
+    user ids running from 1 to num_users.
+    """
+    def __init__(self, num_users, firsts, seconds):
+        self.num_users = num_users
+        if np is not None:
+            endpoints = np.concatenate([np.frombuffer(firsts, dtype=np.int64), np.frombuffer(seconds, dtype=np.int64)])
+            others = np.concatenate([np.frombuffer(seconds, dtype=np.int64), np.frombuffer(firsts, dtype=np.int64)])
+            counts = np.bincount(endpoints, minlength=num_users + 1)
+            offsets = np.zeros(num_users + 2, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            self.offsets = array('q', offsets.tobytes())
+            # sorting one combined key groups friends by user far faster
+            # than an argsort and gather
+            keys = endpoints * (num_users + 1) + others
+            keys.sort()
+            self.friends = array('q', (keys % (num_users + 1)).tobytes())
+            return
+
+        # counting sort of both directions of every friendship
+        self.offsets = array('q', [0]) * (num_users + 2)
+        for user_id in firsts:
+            self.offsets[user_id + 1] += 1
+        for user_id in seconds:
+            self.offsets[user_id + 1] += 1
+        for i in range(num_users + 1):
+            self.offsets[i + 1] += self.offsets[i]
+        self.friends = array('q', [0]) * self.offsets[-1]
+        cursor = self.offsets[:-1]
+        for first, second in zip(firsts, seconds):
+            self.friends[cursor[first]] = second
+            cursor[first] += 1
+            self.friends[cursor[second]] = first
+            cursor[second] += 1
+
+    def __getitem__(self, user_id):
+        if not (isinstance(user_id, int) and 1 <= user_id <= self.num_users):
+            raise KeyError(user_id)
+        return self.friends[self.offsets[user_id]:self.offsets[user_id + 1]]
+
+    def __iter__(self):
+        return iter(range(1, self.num_users + 1))
+
+    def __len__(self):
+        return self.num_users
+
+class SocialPaths(Mapping):
+
+    """
+    Read-only map of every user in an extended network to their shortest
+    friendship path, stored as parent and distance arrays (or dictionaries)
+    indexed by user id. Paths are only built when looked up.
+    """
+    def __init__(self, user_id, parents, distances, order):
+        self.user_id = user_id
+        self.parents = parents
+        self.distances = distances
+        # reached users, in breadth-first order except for the live view
+        # of a watched user, whose order changes as paths are repaired
+        self.order = order
+
+    def __getitem__(self, user_id):
+        distance = self.distance(user_id)
+        if distance < 0:
+            raise KeyError(user_id)
+        path = [0] * (distance + 1)
+        for i in range(distance, -1, -1):
+            path[i] = user_id
+            user_id = self.parents[user_id]
+        return path
+
+    def distance(self, user_id):
+        """
+        Return the degrees of separation to user_id, or -1 if unreached.
+        """
+        if not isinstance(user_id, int) or user_id < 0:
+            return -1
+        try:
+            return self.distances[user_id]
+        except (IndexError, KeyError):
+            return -1
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+def erdos_renyi_friendships(num_users, avg_friendships, rng=random):
+    """
+    Yield the friendships of a G(n, p) random graph, where each pair is
+    friends with probability p = avg_friendships / (num_users - 1).
+
+    Rather than testing every pair, geometric skips jump straight to the
+    next pair that is friends, so this runs in O(V + E) expected time.
+    """
+    if num_users < 2:
+        return
+    p = avg_friendships / (num_users - 1)
+    if p <= 0:
+        return
+    if p >= 1:
+        for v in range(2, num_users + 1):
+            for w in range(1, v):
+                yield v, w
+        return
+    log_q = log(1 - p)
+    # pairs (v, w) with w < v, walked in order with 0-based ids
+    v, w = 1, -1
+    while v < num_users:
+        w += 1 + floor(log(1 - rng.random()) / log_q)
+        while w >= v and v < num_users:
+            w -= v
+            v += 1
+        if v < num_users:
+            yield v + 1, w + 1
+
+def barabasi_albert_friendships(num_users, avg_friendships, rng=random):
+    """
+    Yield the friendships of a preferential attachment network: each new
+    user befriends avg_friendships // 2 existing users (at least one),
+    chosen with probability proportional to how many friends they have.
+    """
+    m = max(1, avg_friendships // 2)
+    if num_users <= m:
+        return
+    # every user appears once per friendship they are part of, so a
+    # uniform pick from this list is a pick weighted by friend count
+    repeated = []
+    targets = list(range(1, m + 1))
+    for user_id in range(m + 1, num_users + 1):
+        for target in targets:
+            yield user_id, target
+        repeated.extend(targets)
+        repeated.extend([user_id] * m)
+        chosen = set()
+        while len(chosen) < m:
+            chosen.add(rng.choice(repeated))
+        targets = list(chosen)
+
+def watts_strogatz_friendships(num_users, avg_friendships, rng=random, rewire=0.1):
+    """
+    Yield the friendships of a small world network: users in a ring are
+    friends with the avg_friendships // 2 nearest users on each side, then
+    each friendship is moved to a random user with probability rewire.
+    """
+    k = avg_friendships // 2
+    # checked here rather than in the generator, so a bad call fails
+    # before populate_graph has reset anything
+    if num_users <= 2 * k:
+        raise Exception("avg_friendships must be less than num_users")
+    return _watts_strogatz_friendships(num_users, k, rng, rewire)
+
+def _watts_strogatz_friendships(num_users, k, rng, rewire):
+    friends = [set() for _ in range(num_users)]
+    for user in range(num_users):
+        for offset in range(1, k + 1):
+            friend = (user + offset) % num_users
+            friends[user].add(friend)
+            friends[friend].add(user)
+    for offset in range(1, k + 1):
+        for user in range(num_users):
+            friend = (user + offset) % num_users
+            if rng.random() < rewire and friend in friends[user]:
+                new_friend = rng.randrange(num_users)
+                if new_friend == user or new_friend in friends[user]:
+                    continue
+                friends[user].discard(friend)
+                friends[friend].discard(user)
+                friends[user].add(new_friend)
+                friends[new_friend].add(user)
+    for user in range(num_users):
+        for friend in friends[user]:
+            if user < friend:
+                yield user + 1, friend + 1
+
+def decode_friendships(friendship_ids, num_users):
+    """
+    Turn triangle-numbered friendship ids (see populate_graph) into
+    two arrays of user ids, one for each side of the friendship.
+    """
+    if np is not None:
+        ids = np.asarray(friendship_ids, dtype=np.int64)
+        rounded = np.ceil((np.sqrt(8 * ids + 1) - 1) / 2).astype(np.int64)
+        # correct any float rounding so rounded is the smallest
+        # integer whose triangle number is at least the id
+        rounded += (rounded + 1) * rounded // 2 < ids
+        rounded -= rounded * (rounded - 1) // 2 >= ids
+        difference = (rounded + 1) * rounded // 2 - ids
+        return (array('q', (rounded - difference).tobytes()),
+                array('q', (num_users - difference).tobytes()))
+
+    firsts, seconds = array('q'), array('q')
+    for friendship_id in friendship_ids:
+        rounded = (isqrt(8 * friendship_id + 1) - 1) // 2
+        if (rounded + 1) * rounded // 2 < friendship_id:
+            rounded += 1
+        difference = (rounded + 1) * rounded // 2 - friendship_id
+        firsts.append(rounded - difference)
+        seconds.append(num_users - difference)
+    return firsts, seconds
+
 def fisher_yates_shuffle(l):
     for i in range(0, len(l)):
         random_index = random.randint(i, len(l) - 1)
@@ -16,6 +257,9 @@ class SocialGraph:
         self.last_id = 0
         self.users = {}
         self.friendships = {}
+        # shortest path trees kept up to date for watched users, each
+        # a (distances, parents) pair of dictionaries
+        self.watched = {}
 
     def add_friendship(self, user_id, friend_id):
         """
@@ -28,6 +272,102 @@ class SocialGraph:
         else:
             self.friendships[user_id].add(friend_id)
             self.friendships[friend_id].add(user_id)
+            for distances, parents in self.watched.values():
+                self._repair_added(distances, parents, user_id, friend_id)
+
+    def remove_friendship(self, user_id, friend_id):
+        """
+        Removes a bi-directional friendship
+        """
+        if friend_id not in self.friendships[user_id]:
+            print("WARNING: Friendship does not exist")
+        else:
+            self.friendships[user_id].discard(friend_id)
+            self.friendships[friend_id].discard(user_id)
+            for distances, parents in self.watched.values():
+                self._repair_removed(distances, parents, user_id, friend_id)
+
+    def watch(self, user_id):
+        """
+        Keep user_id's shortest friendship paths up to date as friendships
+        are added and removed, so get_all_social_paths(user_id, lazy=True)
+        does not have to search again.
+        """
+        distances = {user_id: 0}
+        parents = {user_id: None}
+        q = deque([user_id])
+        while len(q) > 0:
+            user = q.popleft()
+            for neighbor in self.friendships[user]:
+                if neighbor not in distances:
+                    distances[neighbor] = distances[user] + 1
+                    parents[neighbor] = user
+                    q.append(neighbor)
+        self.watched[user_id] = (distances, parents)
+
+    def unwatch(self, user_id):
+        self.watched.pop(user_id, None)
+
+    def _repair_added(self, distances, parents, user_id, friend_id):
+        # the new friendship can only shorten paths through its closer end
+        near, far = user_id, friend_id
+        if near not in distances or (far in distances and distances[far] < distances[near]):
+            near, far = far, near
+        if near not in distances or (far in distances and distances[far] <= distances[near] + 1):
+            return
+        distances[far] = distances[near] + 1
+        parents[far] = near
+        q = deque([far])
+        while len(q) > 0:
+            user = q.popleft()
+            for neighbor in self.friendships[user]:
+                if neighbor not in distances or distances[user] + 1 < distances[neighbor]:
+                    distances[neighbor] = distances[user] + 1
+                    parents[neighbor] = user
+                    q.append(neighbor)
+
+    def _repair_removed(self, distances, parents, user_id, friend_id):
+        # only losing a tree edge changes anything, and then only for
+        # the users below it in the tree
+        if parents.get(friend_id) == user_id and user_id in distances:
+            child = friend_id
+        elif parents.get(user_id) == friend_id and friend_id in distances:
+            child = user_id
+        else:
+            return
+        for neighbor in self.friendships[child]:
+            if distances.get(neighbor) == distances[child] - 1:
+                parents[child] = neighbor
+                return
+
+        affected = {child}
+        stack = [child]
+        while len(stack) > 0:
+            user = stack.pop()
+            for neighbor in self.friendships[user]:
+                if neighbor not in affected and parents.get(neighbor) == user:
+                    affected.add(neighbor)
+                    stack.append(neighbor)
+        for user in affected:
+            del distances[user]
+            del parents[user]
+
+        # reattach the affected users, closest first
+        heap = []
+        for user in affected:
+            for neighbor in self.friendships[user]:
+                if neighbor in distances:
+                    heap.append((distances[neighbor] + 1, user, neighbor))
+        heapq.heapify(heap)
+        while len(heap) > 0:
+            distance, user, parent = heapq.heappop(heap)
+            if user in distances:
+                continue
+            distances[user] = distance
+            parents[user] = parent
+            for neighbor in self.friendships[user]:
+                if neighbor in affected and neighbor not in distances:
+                    heapq.heappush(heap, (distance + 1, neighbor, user))
 
     def add_user(self, name):
         """
@@ -37,7 +377,34 @@ class SocialGraph:
         self.users[self.last_id] = User(name)
         self.friendships[self.last_id] = set()
 
-    def populate_graph(self, num_users, avg_friendships):
+    def populate_from_edges(self, num_users, edges, compact=False):
+        """
+        Reset the graph to num_users users with a friendship for each
+        (user_id, friend_id) pair in edges. Self friendships and repeated
+        pairs are skipped silently.
+
+        With compact=True the pairs must already be free of both, and the
+        friendships are stored as a read-only CompactFriendships.
+        """
+        self.last_id = num_users
+        self.watched = {}
+        if compact:
+            firsts, seconds = array('q'), array('q')
+            for user_id, friend_id in edges:
+                firsts.append(user_id)
+                seconds.append(friend_id)
+            self.users = LazyUsers(num_users)
+            self.friendships = CompactFriendships(num_users, firsts, seconds)
+            return
+
+        self.users = {i: User(i - 1) for i in range(1, num_users + 1)}
+        self.friendships = {i: set() for i in range(1, num_users + 1)}
+        for user_id, friend_id in edges:
+            if user_id != friend_id:
+                self.friendships[user_id].add(friend_id)
+                self.friendships[friend_id].add(user_id)
+
+    def populate_graph(self, num_users, avg_friendships, compact=False, generator=None, rng=random):
         """
         Takes a number of users and an average number of friendships
         as arguments
@@ -46,8 +413,40 @@ class SocialGraph:
         between those users.
 
         The number of users must be greater than the average number of friendships.
+
+        With compact=True the friendships are written straight into a
+        read-only CompactFriendships and users are only created when
+        looked up, which is much faster and smaller for large graphs.
+
+        generator can be one of the *_friendships functions (or any
+        function with the same arguments) to use a different random
+        network model instead of uniformly random pairs.
+
+        rng is the source of randomness, the random module by default or
+        a random.Random for a separate, seeded stream.
         """
+        if generator is not None:
+            self.populate_from_edges(num_users, generator(num_users, avg_friendships, rng), compact)
+            return
+
+        if compact:
+            num_friendships = num_users * avg_friendships // 2
+            num_possible = (num_users - 1) * num_users // 2
+            if np is not None:
+                # drawn straight into an int64 array, seeded from rng so
+                # seeding it still makes the graph reproducible
+                np_rng = np.random.default_rng(rng.getrandbits(64))
+                friendship_ids = np_rng.choice(num_possible, num_friendships, replace=False) + 1
+            else:
+                friendship_ids = rng.sample(range(1, num_possible + 1), num_friendships)
+            self.last_id = num_users
+            self.watched = {}
+            self.users = LazyUsers(num_users)
+            self.friendships = CompactFriendships(num_users, *decode_friendships(friendship_ids, num_users))
+            return
+
         # Reset graph
+        self.watched = {}
         self.last_id = 0
         self.users = {}
         self.friendships = {}
@@ -74,7 +473,7 @@ class SocialGraph:
         # there are a 'triangle' number of possible friendships, we can ID them all
         num_possible = (num_users - 1) * num_users // 2
         # pick a random sample
-        for friendship_id in random.sample(range(1, num_possible + 1), num_friendships):
+        for friendship_id in rng.sample(range(1, num_possible + 1), num_friendships):
             reverse_triangle = (sqrt(8 * friendship_id + 1) - 1) / 2
             rounded = ceil(reverse_triangle)
             # get the first triangle number greater or equal to friendship_id
@@ -85,7 +484,7 @@ class SocialGraph:
             second_friend = num_users - difference
             self.add_friendship(first_friend, second_friend)
 
-    def get_all_social_paths(self, user_id):
+    def get_all_social_paths(self, user_id, lazy=False):
         """
         Takes a user's user_id as an argument
 
@@ -93,7 +492,18 @@ class SocialGraph:
         extended network with the shortest friendship path between them.
 
         The key is the friend's ID and the value is the path.
+
+        With lazy=True a SocialPaths view is returned instead, which
+        only stores a parent and distance per user. For a watched user
+        this is a live view of the maintained paths, and iterating over it
+        gives users in no particular order.
         """
+        if lazy:
+            if user_id in self.watched:
+                distances, parents = self.watched[user_id]
+                return SocialPaths(user_id, parents, distances, distances)
+            return self._get_social_path_tree(user_id)
+
         visited = {}  # Note that this is a dictionary, not a set
 
         # Stores the next neighbors to add, and also the node one level closer
@@ -102,6 +512,10 @@ class SocialGraph:
         q.append((user_id, None))
         while len(q) > 0:
             user, prev = q.popleft()
+            # a user can be queued more than once before being reached,
+            # the first time through is the shortest path
+            if user in visited:
+                continue
             # write the path for the current user
             visited[user] = visited[prev] + [user] if prev is not None else [user]
             for neighbor in self.friendships[user]:
@@ -110,6 +524,170 @@ class SocialGraph:
 
         return visited
 
+    def get_distance_histogram(self, user_id):
+        """
+        Return a list where entry d is the number of users exactly d
+        friendships away from user_id, found with a single breadth-first
+        search that only marks users as seen.
+        """
+        seen = bytearray(self.last_id + 1)
+        seen[user_id] = 1
+        frontier = [user_id]
+        histogram = []
+        while len(frontier) > 0:
+            histogram.append(len(frontier))
+            next_frontier = []
+            for user in frontier:
+                for neighbor in self.friendships[user]:
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        return histogram
+
+    def get_separation_stats(self, user_id):
+        """
+        Return a dictionary with the number of other users in user_id's
+        extended network ("reach"), the distance histogram and the mean,
+        median, 90th percentile and maximum degree of separation.
+        """
+        return separation_summary(self.get_distance_histogram(user_id))
+
+    def estimate_separation_stats(self, samples=100, seed=None):
+        """
+        Estimate whole-network separation stats by combining the distance
+        histograms of a random sample of users. "max" is then a lower
+        bound on the network's diameter.
+        """
+        rng = random.Random(seed)
+        user_ids = list(self.friendships)
+        sources = rng.sample(user_ids, min(samples, len(user_ids)))
+        combined = []
+        for user_id in sources:
+            for distance, count in enumerate(self.get_distance_histogram(user_id)):
+                if distance == len(combined):
+                    combined.append(0)
+                combined[distance] += count
+        return separation_summary(combined)
+
+    def _get_social_path_tree(self, user_id):
+        parents = array('q', [0]) * (self.last_id + 1)
+        distances = array('q', [-1]) * (self.last_id + 1)
+        order = array('q', [user_id])
+        distances[user_id] = 0
+        q = deque([user_id])
+        while len(q) > 0:
+            user = q.popleft()
+            distance = distances[user] + 1
+            for neighbor in self.friendships[user]:
+                if distances[neighbor] < 0:
+                    distances[neighbor] = distance
+                    parents[neighbor] = user
+                    order.append(neighbor)
+                    q.append(neighbor)
+
+        return SocialPaths(user_id, parents, distances, order)
+
+def histogram_percentile(histogram, percent):
+    """
+    Return the smallest distance d such that at least percent of the
+    counted users are within d, given histogram[d] users at distance d.
+    """
+    total = sum(histogram)
+    needed = total * percent / 100
+    running = 0
+    for distance, count in enumerate(histogram):
+        running += count
+        if count > 0 and running >= needed:
+            return distance
+    return len(histogram) - 1
+
+def separation_summary(histogram):
+    """
+    Summarize a distance histogram (ignoring distance 0) into reach,
+    mean and percentile degrees of separation.
+    """
+    histogram = [0] + list(histogram[1:])
+    reach = sum(histogram)
+    if reach == 0:
+        return {"reach": 0, "histogram": histogram, "mean": 0.0,
+                "median": 0, "p90": 0, "max": 0}
+    return {
+        "reach": reach,
+        "histogram": histogram,
+        "mean": sum(d * count for d, count in enumerate(histogram)) / reach,
+        "median": histogram_percentile(histogram, 50),
+        "p90": histogram_percentile(histogram, 90),
+        "max": len(histogram) - 1,
+    }
+
+def run_trial(num_users, avg_friendships, seed, compact=False, generator=None):
+    """
+    Populate a graph using the given random seed and return
+    (fraction of other users in user 1's extended network,
+    average degree of separation), or None if user 1 has no friends.
+    """
+    sg = SocialGraph()
+    sg.populate_graph(num_users, avg_friendships, compact, generator, random.Random(seed))
+    stats = sg.get_separation_stats(1)
+    if stats["reach"] == 0:
+        # slim chance this can happen
+        return None
+
+    return stats["reach"] / (num_users - 1), stats["mean"]
+
+def _run_trial(args):
+    return run_trial(*args)
+
+def iter_trials(num_users, avg_friendships, trials, seed=None, processes=None, compact=False, generator=None):
+    """
+    Yield the result of run_trial for each of the given number of trials,
+    in order. Each trial gets its own seed drawn from seed, so results are
+    reproducible however the trials are spread over processes.
+    """
+    seeds = random.Random(seed)
+    jobs = ((num_users, avg_friendships, seeds.getrandbits(64), compact, generator) for _ in range(trials))
+    if processes is None:
+        for job in jobs:
+            yield _run_trial(job)
+    else:
+        with Pool(processes) as pool:
+            yield from pool.imap(_run_trial, jobs, chunksize=max(1, trials // (4 * processes)))
+
+def confidence_interval(values, z=1.96):
+    """
+    Return (mean, low, high) with a normal approximation confidence
+    interval for the mean (95% by default). All three are NaN when
+    there are no values.
+    """
+    n = len(values)
+    if n == 0:
+        return nan, nan, nan
+    mean = sum(values) / n
+    if n < 2:
+        return mean, mean, mean
+    variance = sum((v - mean) ** 2 for v in values) / (n - 1)
+    margin = z * sqrt(variance / n)
+    return mean, mean - margin, mean + margin
+
+def run_experiment(num_users, avg_friendships, trials=1000, seed=None, processes=None, compact=False, generator=None):
+    """
+    Run the given number of trials and return a dictionary with the
+    number of usable trials and (mean, low, high) for the extended
+    network coverage and the average degree of separation.
+    """
+    coverage = []
+    separation = []
+    for result in iter_trials(num_users, avg_friendships, trials, seed, processes, compact, generator):
+        if result is not None:
+            coverage.append(result[0])
+            separation.append(result[1])
+    return {
+        "trials": len(coverage),
+        "coverage": confidence_interval(coverage),
+        "separation": confidence_interval(separation),
+    }
+
 if __name__ == '__main__':
     # sg = SocialGraph()
     # sg.populate_graph(10, 2)
@@ -118,28 +696,9 @@ if __name__ == '__main__':
     # print(connections)
 
     # question 1 and 2:
-    q1_results = []
-    q2_results = []
-    for _ in range(1000):
-        sg = SocialGraph()
-        sg.populate_graph(1000, 5)
-        network = sg.get_all_social_paths(1)
-        network_count = len(network) - 1 # exclude self
-        if network_count == 0:
-            # slim chance this can happen
-            continue
-        
-        degree_of_separation = 0
-        for person in network.items():
-            if person[0] != 1: # exclude self
-                degree_of_separation += len(person[1]) - 1
-        degree_of_separation /= network_count
-        
-        q1_results.append(network_count / 999)
-        q2_results.append(degree_of_separation)
+    results = run_experiment(1000, 5, trials=1000, processes=os.cpu_count())
 
     print("Q1: percent of users in extended network")
-    print(sum(q1_results) / len(q1_results))
+    print("%.4f (95%% CI %.4f - %.4f)" % results["coverage"])
     print("Q2: average degree of separation")
-    print(sum(q2_results) / len(q2_results))
-
+    print("%.4f (95%% CI %.4f - %.4f)" % results["separation"])
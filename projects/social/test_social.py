@@ -0,0 +1,237 @@
+import unittest
+import random
+from math import isnan
+from array import array
+import social
+from social import SocialGraph, LazyUsers, CompactFriendships, decode_friendships
+from social import erdos_renyi_friendships, barabasi_albert_friendships, watts_strogatz_friendships
+from social import run_trial, run_experiment, confidence_interval
+from social import histogram_percentile, separation_summary
+
+class Test(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(0)
+        self.sg = SocialGraph()
+        self.sg.populate_from_edges(60, erdos_renyi_friendships(60, 3, self.rng))
+
+    def assertWatchedMatches(self, user_id):
+        distances, parents = self.sg.watched[user_id]
+        paths = self.sg.get_all_social_paths(user_id)
+        self.assertDictEqual(distances, {u: len(path) - 1 for u, path in paths.items()})
+        for u in distances:
+            if u == user_id:
+                self.assertIsNone(parents[u])
+            else:
+                # any shortest path tree is fine, so check the parent is
+                # a friend one step closer
+                self.assertIn(parents[u], self.sg.friendships[u])
+                self.assertEqual(distances[parents[u]], distances[u] - 1)
+
+    def assertPathValid(self, path, user_id, friend_id):
+        self.assertEqual((path[0], path[-1]), (user_id, friend_id))
+        for a, b in zip(path, path[1:]):
+            self.assertIn(b, self.sg.friendships[a])
+
+    def test_get_all_social_paths(self):
+        self.sg.populate_from_edges(6, [(1, 2), (1, 3), (2, 4), (3, 4), (4, 5), (2, 5)])
+        paths = self.sg.get_all_social_paths(1)
+        self.assertSetEqual(set(paths), {1, 2, 3, 4, 5})
+        self.assertListEqual(paths[1], [1])
+        self.assertListEqual(paths[5], [1, 2, 5])
+        self.assertEqual(len(paths[4]), 3)
+
+    def test_get_all_social_paths_are_shortest(self):
+        for user_id in range(1, 61):
+            paths = self.sg.get_all_social_paths(user_id)
+            histogram = self.sg.get_distance_histogram(user_id)
+            lengths = [0] * len(histogram)
+            for friend_id, path in paths.items():
+                self.assertPathValid(path, user_id, friend_id)
+                lengths[len(path) - 1] += 1
+            self.assertListEqual(lengths, histogram)
+
+    def test_lazy_social_paths(self):
+        for user_id in [1, 2, 3]:
+            paths = self.sg.get_all_social_paths(user_id)
+            lazy = self.sg.get_all_social_paths(user_id, lazy=True)
+            self.assertEqual(len(lazy), len(paths))
+            self.assertSetEqual(set(lazy), set(paths))
+            order = list(lazy)
+            self.assertEqual(order[0], user_id)
+            # unwatched views iterate in breadth-first order
+            distances = [lazy.distance(u) for u in order]
+            self.assertListEqual(distances, sorted(distances))
+            for friend_id, path in paths.items():
+                self.assertEqual(lazy.distance(friend_id), len(path) - 1)
+                self.assertEqual(len(lazy[friend_id]), len(path))
+                self.assertPathValid(lazy[friend_id], user_id, friend_id)
+        self.sg.populate_from_edges(4, [(1, 2)])
+        lazy = self.sg.get_all_social_paths(1, lazy=True)
+        self.assertEqual(lazy.distance(3), -1)
+        self.assertEqual(lazy.distance(99), -1)
+        self.assertRaises(KeyError, lazy.__getitem__, 3)
+        self.assertNotIn(3, lazy)
+
+    def test_get_distance_histogram(self):
+        self.sg.populate_from_edges(7, [(1, 2), (1, 3), (2, 4), (3, 4), (4, 5), (6, 7)])
+        self.assertListEqual(self.sg.get_distance_histogram(1), [1, 2, 1, 1])
+        self.assertListEqual(self.sg.get_distance_histogram(6), [1, 1])
+
+    def test_histogram_percentile(self):
+        histogram = [0, 2, 5, 2, 1]
+        self.assertEqual(histogram_percentile(histogram, 0), 1)
+        self.assertEqual(histogram_percentile(histogram, 20), 1)
+        self.assertEqual(histogram_percentile(histogram, 50), 2)
+        self.assertEqual(histogram_percentile(histogram, 90), 3)
+        self.assertEqual(histogram_percentile(histogram, 100), 4)
+
+    def test_separation_summary(self):
+        stats = separation_summary([1, 2, 1, 1])
+        self.assertDictEqual(stats, {"reach": 4, "histogram": [0, 2, 1, 1], "mean": 7 / 4,
+                                     "median": 1, "p90": 3, "max": 3})
+        self.assertEqual(separation_summary([1])["reach"], 0)
+        self.assertEqual(separation_summary([1])["mean"], 0.0)
+
+    def test_get_separation_stats(self):
+        for user_id in [1, 2, 3]:
+            paths = self.sg.get_all_social_paths(user_id)
+            lengths = [len(path) - 1 for u, path in paths.items() if u != user_id]
+            stats = self.sg.get_separation_stats(user_id)
+            self.assertEqual(stats["reach"], len(lengths))
+            self.assertAlmostEqual(stats["mean"], sum(lengths) / len(lengths))
+            self.assertEqual(stats["max"], max(lengths))
+
+    def test_estimate_separation_stats(self):
+        # sampling every user gives the exact combined histogram
+        combined = [0]
+        for user_id in range(1, 61):
+            for distance, count in enumerate(self.sg.get_distance_histogram(user_id)):
+                if distance == len(combined):
+                    combined.append(0)
+                combined[distance] += count
+        self.assertDictEqual(self.sg.estimate_separation_stats(samples=100), separation_summary(combined))
+        estimate = self.sg.estimate_separation_stats(samples=10, seed=4)
+        self.assertDictEqual(self.sg.estimate_separation_stats(samples=10, seed=4), estimate)
+        self.assertLessEqual(estimate["max"], separation_summary(combined)["max"])
+
+    def test_watch(self):
+        self.sg.watch(1)
+        self.assertWatchedMatches(1)
+        lazy = self.sg.get_all_social_paths(1, lazy=True)
+        self.assertSetEqual(set(lazy), set(self.sg.get_all_social_paths(1)))
+        self.sg.unwatch(1)
+        self.assertDictEqual(self.sg.watched, {})
+
+    def test_watch_repair(self):
+        self.sg.watch(1)
+        self.sg.watch(2)
+        for _ in range(300):
+            user_id, friend_id = self.rng.sample(range(1, 61), 2)
+            if friend_id in self.sg.friendships[user_id]:
+                self.sg.remove_friendship(user_id, friend_id)
+            else:
+                self.sg.add_friendship(user_id, friend_id)
+            self.assertWatchedMatches(1)
+            self.assertWatchedMatches(2)
+
+    def test_run_trial_keeps_global_random_state(self):
+        random.seed(1)
+        expected = random.random()
+        random.seed(1)
+        first = run_trial(100, 4, seed=7)
+        self.assertEqual(random.random(), expected)
+        self.assertEqual(run_trial(100, 4, seed=7), first)
+        for generator in [None, erdos_renyi_friendships]:
+            results = run_experiment(100, 4, trials=5, seed=3, generator=generator)
+            self.assertEqual(run_experiment(100, 4, trials=5, seed=3, generator=generator), results)
+
+    def test_run_experiment_without_trials(self):
+        self.assertTrue(all(isnan(v) for v in confidence_interval([])))
+        self.assertTupleEqual(confidence_interval([2.0]), (2.0, 2.0, 2.0))
+        results = run_experiment(100, 4, trials=0)
+        self.assertEqual(results["trials"], 0)
+        self.assertTrue(all(isnan(v) for v in results["coverage"] + results["separation"]))
+
+    def assertFriendshipsValid(self, edges, num_users, mean_degree, tolerance):
+        seen = set()
+        for user_id, friend_id in edges:
+            self.assertNotEqual(user_id, friend_id)
+            self.assertTrue(1 <= user_id <= num_users and 1 <= friend_id <= num_users)
+            pair = (min(user_id, friend_id), max(user_id, friend_id))
+            self.assertNotIn(pair, seen)
+            seen.add(pair)
+        self.assertAlmostEqual(2 * len(seen) / num_users, mean_degree, delta=tolerance)
+
+    def test_erdos_renyi_friendships(self):
+        edges = erdos_renyi_friendships(2000, 10, self.rng)
+        self.assertFriendshipsValid(edges, 2000, 10, 0.5)
+        self.assertEqual(len(list(erdos_renyi_friendships(5, 4, self.rng))), 10)
+
+    def test_barabasi_albert_friendships(self):
+        # m = 5 friendships per new user after the first 5
+        edges = barabasi_albert_friendships(2000, 10, self.rng)
+        self.assertFriendshipsValid(edges, 2000, 2 * 5 * 1995 / 2000, 0.001)
+
+    def test_watts_strogatz_friendships(self):
+        edges = watts_strogatz_friendships(2000, 10, self.rng)
+        self.assertFriendshipsValid(edges, 2000, 10, 0.1)
+        self.assertRaises(Exception, watts_strogatz_friendships, 10, 10, self.rng)
+        # a bad call leaves the graph as it was
+        friendships = {u: set(f) for u, f in self.sg.friendships.items()}
+        self.assertRaises(Exception, self.sg.populate_graph, 10, 10, generator=watts_strogatz_friendships)
+        self.assertDictEqual(self.sg.friendships, friendships)
+
+    def test_decode_friendships(self):
+        num_users = 6
+        num_possible = (num_users - 1) * num_users // 2
+        firsts, seconds = decode_friendships(range(1, num_possible + 1), num_users)
+        pairs = list(zip(firsts, seconds))
+        self.assertEqual(len(set(pairs)), num_possible)
+        for first, second in pairs:
+            self.assertTrue(1 <= first < second <= num_users)
+
+    def test_decode_friendships_without_numpy(self):
+        num_users = 40
+        friendship_ids = list(range(1, (num_users - 1) * num_users // 2 + 1))
+        expected = decode_friendships(friendship_ids, num_users)
+        np_ = social.np
+        social.np = None
+        try:
+            self.assertEqual(decode_friendships(friendship_ids, num_users), expected)
+        finally:
+            social.np = np_
+
+    def test_compact_friendships(self):
+        pairs = [(1, 2), (1, 3), (4, 2), (5, 1)]
+        friendships = CompactFriendships(6, array('q', [p[0] for p in pairs]), array('q', [p[1] for p in pairs]))
+        self.assertEqual(len(friendships), 6)
+        self.assertListEqual(list(friendships), [1, 2, 3, 4, 5, 6])
+        self.assertSetEqual(set(friendships[1]), {2, 3, 5})
+        self.assertSetEqual(set(friendships[2]), {1, 4})
+        self.assertSetEqual(set(friendships[6]), set())
+        self.assertRaises(KeyError, friendships.__getitem__, 0)
+        self.assertRaises(KeyError, friendships.__getitem__, 7)
+
+    def test_lazy_users(self):
+        users = LazyUsers(3)
+        self.assertEqual(len(users), 3)
+        self.assertEqual(len(users.created), 0)
+        self.assertEqual(users[2].name, 1)
+        self.assertIs(users[2], users[2])
+        self.assertEqual(len(users.created), 1)
+        self.assertRaises(KeyError, users.__getitem__, 4)
+
+    def test_populate_graph_compact(self):
+        sg = SocialGraph()
+        sg.populate_graph(200, 6, compact=True)
+        self.assertEqual(len(sg.users), 200)
+        self.assertEqual(sum(len(sg.friendships[u]) for u in sg.friendships), 200 * 6)
+        for user_id in sg.friendships:
+            friends = list(sg.friendships[user_id])
+            self.assertEqual(len(friends), len(set(friends)))
+            self.assertNotIn(user_id, friends)
+            for friend_id in friends:
+                self.assertIn(user_id, sg.friendships[friend_id])
+
+if __name__ == '__main__':
+    unittest.main()